@@ -11,14 +11,18 @@
     Date: 20/06/2017
 """
 
+import copy
+import multiprocessing
 import os
 import sys
+from collections import OrderedDict
 
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 from mpl_toolkits.axes_grid1 import make_axes_locatable
-from scipy.interpolate import griddata
+from scipy.interpolate import CloughTocher2DInterpolator, LinearNDInterpolator, griddata, interp1d
+from scipy.spatial import Delaunay
 
 import mtpy
 import mtpy.modeling.occam2d_rewrite as occam2d
@@ -32,6 +36,8 @@ from mtpy.utils.mtpylog import MtPyLog
 _logger = MtPyLog.get_mtpy_logger(__name__)
 # default contains of rholist
 DEFAULT_RHOLIST = {'zxy', 'zyx', 'det'}
+# scaling parameter of the penetration depth, sqrt(1/(2*pi*mu0))
+SCALE_PARAM = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
 
 
 class Depth1D(ImagingBase):
@@ -78,15 +84,13 @@ class Depth1D(ImagingBase):
 
         zeta = self._data.Z  # the attribute Z represent the impedance tensor 2X2 matrix
         freqs = zeta.freq  # frequencies
-        scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
-
         # The periods array
         periods = 1.0 / freqs
         legendh = []
 
         if 'zxy' in self._rholist:
             # One of the 4-components: XY
-            penetration_depth = scale_param * \
+            penetration_depth = SCALE_PARAM * \
                                 np.sqrt(zeta.resistivity[:, 0, 1] * periods)
 
             # pen_zxy, = plt.semilogx(periods, -penetration_depth, '-*',label='Zxy')
@@ -98,7 +102,7 @@ class Depth1D(ImagingBase):
             legendh.append(pen_zxy)
 
         if 'zyx' in self._rholist:
-            penetration_depth = scale_param * \
+            penetration_depth = SCALE_PARAM * \
                                 np.sqrt(zeta.resistivity[:, 1, 0] * periods)
 
             pen_zyx, = plt.semilogx(
@@ -108,7 +112,7 @@ class Depth1D(ImagingBase):
         if 'det' in self._rholist:
             # determinant
             det2 = np.abs(zeta.det[0])
-            det_penetration_depth = scale_param * np.sqrt(0.2 * periods * det2 * periods)
+            det_penetration_depth = SCALE_PARAM * np.sqrt(0.2 * periods * det2 * periods)
 
             # pen_det, = plt.semilogx(periods, -det_penetration_depth, '-^', label='Determinant')
             pen_det, = plt.semilogx(
@@ -265,11 +269,13 @@ class Depth3D(ImagingBase):
                                                                                  self._period,
                                                                                  whichrho=self._rho, ptol=self._ptol)
 
-        # create figure
-        self._fig = plt.figure(figsize=(8, 6), dpi=80)
+        periods_ok = check_period_values(periods)
+
+        # create figure, in its final size so that it is not resized and laid out again after plotting
+        self._fig = plt.figure(figsize=(6, 6) if periods_ok else (8, 6), dpi=80)
         self._fig.set_tight_layout(True)
 
-        if check_period_values(periods) is False:
+        if periods_ok is False:
             self._logger.error("The period values are NOT equal - Please check!!! %s", periods)
             plt.plot(periods, "-^")
             title = "ERROR: Periods are NOT equal !!!"
@@ -285,75 +291,14 @@ class Depth3D(ImagingBase):
                 self._period_fmt = str(mtpy.utils.calculator.roundsf(period0, 4))
             else:
                 self._period_fmt = "%.2f" % period0
-            bbox = get_bounding_box(latlons)
-
-            self._logger.debug("Bounding Box %s", bbox)
-
-            xgrids = bbox[0][1] - bbox[0][0]
-            ygrids = bbox[1][1] - bbox[1][0]
-
-            self._logger.debug("xy grids: %s %s", xgrids, ygrids)
-
-            minlat = bbox[1][0]
-            minlon = bbox[0][0]
-
             # Pixel size in Degree:  0.001=100meters, 0.01=1KM 1deg=100KM
             pixelsize = 0.002  # Degree 0.002=200meters, 0.01=1KM 1deg=100KM
+            pad = 1
+            bbox, zdep, station_points, grid_z = build_depth_grid(latlons, pendep, pixelsize, pad=pad)
+            # number of grids without the padding
+            nx = zdep.shape[1] - pad
+            ny = zdep.shape[0] - pad
 
-            nx = int(np.ceil(xgrids / pixelsize))
-            ny = int(np.ceil(ygrids / pixelsize))
-
-            self._logger.debug("number of grids xy: %s %s", nx, ny)
-
-            # make the image slightly bigger than the (nx, ny) to contain all points
-            # avoid index out of bound
-            pad = 1  # pad = 1 affect the top and right of the plot. it is linked to get_index offset?
-            # todo change this part to use xy bound offset? (0.5 gride on each side?)
-            nx_padded = nx + pad
-            ny_padded = ny + pad
-
-            # fast initialization
-            zdep = np.empty((ny_padded, nx_padded))
-            zdep.fill(np.nan)  # initialize all pixel value as np.nan
-
-            points = np.zeros((len(latlons), 2))
-            values = np.zeros(len(latlons))
-
-            station_points = np.zeros((len(latlons), 2))
-
-            self._logger.debug("zdep shape %s", zdep.shape)
-
-            for iter, (lat, lon) in enumerate(latlons):
-                # self._logger.debug(iter, pair)
-                (xi, yi) = get_index(lat, lon, minlat, minlon, pixelsize)
-                zdep[ny_padded - yi - 1, xi] = np.abs(pendep[iter])
-                # print pair
-                points[iter, 0] = ny_padded - yi - 1
-                points[iter, 1] = xi
-                values[iter] = np.abs(pendep[iter])
-                station_points[iter, 0] = ny_padded - yi - 1
-                station_points[iter, 1] = xi
-
-            # plt.imshow(zdep, interpolation='none') #OR plt.imshow(zdep,  interpolation='spline36')
-            # plt.colorbar()
-            # plt.show() # without this show(), the 2 figure will be plotted in one
-            # canvas, overlay and compare
-
-            # griddata interpolation of the zdep sample MT points.
-            # self._logger.debug(zdep.shape)
-
-            # grid_x, grid_y = np.mgrid[0:95:96j, 0:83:84j]  # this syntax with
-            # complex step 96j has different meaning
-            # this is more straight forward.
-            grid_x, grid_y = np.mgrid[0:ny_padded:1, 0:nx_padded:1]
-
-            # grid_z0 = griddata(points, values, (grid_x, grid_y), method='nearest')
-            grid_z = griddata(points, values, (grid_x, grid_y), method='linear')
-            # grid_z = griddata(points, values, (grid_x, grid_y), method='cubic')
-
-            # method='cubic' may cause negative interp values; set them nan to make
-            # empty
-            grid_z[grid_z < 0] = np.nan
             if z_unit == 'km':  # change to km
                 grid_z = grid_z / 1000.0
 
@@ -383,7 +328,7 @@ class Depth3D(ImagingBase):
             margin = max(padx, pady, min_margin)
             self._logger.debug("**** station_points shape ***** %s", station_points.shape)
             self._logger.debug("**** grid_z shape ***** %s", grid_z.shape)
-            self._logger.debug("margin = %s" % margin)
+            self._logger.debug("margin = %s", margin)
 
             # horizontal axis 0-> the second index (i,j) of the matrix
             plt.xlim(-margin, grid_z.shape[1] + margin)
@@ -391,7 +336,6 @@ class Depth3D(ImagingBase):
             plt.ylim(grid_z.shape[0] + margin, -margin)
 
             ax = plt.gca()
-            plt.gcf().set_size_inches(6, 6)
 
             ftsize = 14
             numticks = 5  # number of ticks to draw 5,10?
@@ -468,70 +412,176 @@ class Depth3D(ImagingBase):
 
 # Utility functions (may need to move to utility module
 
-def get_penetration_depth(mt_obj_list, per_index, whichrho='det'):
+def get_penetration_depth(mt_obj_list, per_index, whichrho='det', processes=1):
     """
     compute the penetration depth of mt_obj at the given period_index, and using whichrho option
     :param per_index: the index of periods 0, 1, ...
     :param mt_obj_list: list of edi file paths or mt objects
     :param whichrho: det, zxy, or zyx
-    :return:
+    :param processes: number of processes used to read the edi files when mt_obj_list is a list of file paths,
+                      None to use all the cpus, the default (1) reads the files in the current process
+    :return: tuple of (stations, periods, penetration depths, lat-lons), where periods and penetration depths are
+             arrays of shape (n,) and lat-lons is an array of shape (n, 2)
     """
 
-    scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
+    if whichrho not in DEFAULT_RHOLIST:
+        _logger.critical(
+            "unsupported method to compute penetration depth: %s",
+            whichrho)
+        # sys.exit(100)
+        raise Exception("unsupported method to compute penetratoin depth: %s" % whichrho)
+
+    mt_obj_list = list(mt_obj_list)  # the list is gone through twice, a generator would be consumed by the check
+    if processes != 1 and all(isinstance(mt_obj, str) for mt_obj in mt_obj_list):
+        station_data = pool_map(_read_rho_at_period,
+                                [(mt_obj, per_index, whichrho) for mt_obj in mt_obj_list],
+                                processes)
+    else:
+        station_data = [_get_rho_at_period(mt_obj, per_index, whichrho) for mt_obj in mt_obj_list]
 
     # per_index=0,1,2,....
-    periods = []
-    pen_depth = []
+    num_mt = len(station_data)
     stations = []
-    latlons = []
-    for mt_obj in mt_obj_list:
-        if isinstance(mt_obj, str) and os.path.isfile(mt_obj):
-            mt_obj = mt.MT(mt_obj)
-        elif not isinstance(mt_obj, mt.MT):
-            raise Exception("Unsupported list of objects %s" % type(mt_obj))
-        # station id
-        stations.append(mt_obj.station)
-        # latlons
-        latlons.append((mt_obj.lat, mt_obj.lon))
-        # the attribute Z
-        zeta = mt_obj.Z
-
-        if per_index >= len(zeta.freq):
-            _logger.debug(
-                "Number of frequecies (Max per_index)= %s", len(
-                    zeta.freq))
-            raise Exception(
-                "Index out_of_range Error: period index must be less than number of periods in zeta.freq")
-
-        per = 1.0 / zeta.freq[per_index]
-        periods.append(per)
-
-        if whichrho == 'zxy':
-            penetration_depth = - scale_param * \
-                                np.sqrt(zeta.resistivity[per_index, 0, 1] * per)
-        elif whichrho == 'zyx':
-            penetration_depth = - scale_param * \
-                                np.sqrt(zeta.resistivity[per_index, 1, 0] * per)
-        elif whichrho == 'det':  # the 2X2 complex Z-matrix's determinant abs value
-            # determinant value at the given period index
-            det2 = np.abs(zeta.det[per_index])
-            penetration_depth = -scale_param * np.sqrt(0.2 * per * det2 * per)
-        else:
-            _logger.critical(
-                "unsupported method to compute penetration depth: %s",
-                whichrho)
-            # sys.exit(100)
-            raise Exception("unsupported method to compute penetratoin depth: %s" % whichrho)
-
-        pen_depth.append(penetration_depth)
+    latlons = np.empty((num_mt, 2))
+    periods = np.empty(num_mt)
+    # resistivity (zxy, zyx) or the abs of the determinant (det) at per_index
+    rho = np.empty(num_mt)
+    for ii, (station, lat, lon, per, station_rho) in enumerate(station_data):
+        stations.append(station)
+        latlons[ii] = lat, lon
+        periods[ii] = per
+        rho[ii] = station_rho
+
+    # compute all the penetration depths in one go
+    if whichrho == 'det':
+        pen_depth = -SCALE_PARAM * np.sqrt(0.2 * periods * rho * periods)
+    else:
+        pen_depth = -SCALE_PARAM * np.sqrt(rho * periods)
 
     return stations, periods, pen_depth, latlons
 
 
-def load_edi_files(edi_path):
+def _get_rho_at_period(mt_obj, per_index, whichrho):
+    """
+    extract the station data at the given period index, that is needed to compute the penetration depth
+    :param mt_obj: edi file path or mt object
+    :param per_index: the index of periods 0, 1, ...
+    :param whichrho: det, zxy, or zyx
+    :return: tuple of (station, lat, lon, period, rho), where rho is the resistivity for zxy and zyx,
+             or the abs value of the determinant of Z for det
+    """
+    if isinstance(mt_obj, str) and os.path.isfile(mt_obj):
+        mt_obj = _get_cached_mt(mt_obj)
+    elif not isinstance(mt_obj, mt.MT):
+        raise Exception("Unsupported list of objects %s" % type(mt_obj))
+
+    # the attribute Z
+    zeta = mt_obj.Z
+
+    if per_index >= len(zeta.freq):
+        _logger.debug(
+            "Number of frequecies (Max per_index)= %s", len(
+                zeta.freq))
+        raise Exception(
+            "Index out_of_range Error: period index must be less than number of periods in zeta.freq")
+
+    if whichrho == 'zxy':
+        rho = zeta.resistivity[per_index, 0, 1]
+    elif whichrho == 'zyx':
+        rho = zeta.resistivity[per_index, 1, 0]
+    else:  # the 2X2 complex Z-matrix's determinant abs value
+        # determinant value at the given period index, only the 2x2 matrix at per_index is needed
+        rho = np.abs(np.linalg.det(zeta.z[per_index]))
+
+    return mt_obj.station, mt_obj.lat, mt_obj.lon, 1.0 / zeta.freq[per_index], rho
+
+
+def _read_rho_at_period(args):
+    """ picklable wrapper of _get_rho_at_period() for pool_map() """
+    return _get_rho_at_period(*args)
+
+
+def pool_map(func, iterable, processes=None, chunksize=8):
+    """
+    apply func to every item of iterable in a multiprocessing pool, func has to be a picklable module level function
+    :param func: function to apply
+    :param iterable: the items
+    :param processes: number of worker processes, None to use all the cpus
+    :param chunksize: number of items sent to a worker at a time
+    :return: list of the results in the order of the items
+    """
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(func, iterable, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+
+# the MT objects read by load_mt(), keyed by the absolute path of the edi file, in least recently used order
+_MT_CACHE = OrderedDict()
+_MT_CACHE_SIZE = 4096
+
+
+def _get_cached_mt(edi_file):
+    """
+    read an edi file into a MT object, reusing the object parsed by an earlier call as long as the modification time
+    of the file is unchanged.
+    The same object is returned to every caller, so it is only for the functions in this module that read the
+    impedance without modifying the object.
+    :param edi_file: path to the edi file
+    :return: mt.MT object
+    """
+    path = os.path.abspath(edi_file)
+    mtime = os.path.getmtime(path)
+    cached = _MT_CACHE.pop(path, None)
+    if cached is not None and cached[0] == mtime:
+        mt_obj = cached[1]
+    else:
+        mt_obj = mt.MT(edi_file)
+    _MT_CACHE[path] = (mtime, mt_obj)  # (re)insert as the most recently used
+    if len(_MT_CACHE) > _MT_CACHE_SIZE:
+        _MT_CACHE.popitem(last=False)
+    return mt_obj
+
+
+def load_mt(edi_file, cache=False):
+    """
+    read an edi file into a MT object.
+    :param edi_file: path to the edi file
+    :param cache: if True, the file is parsed only once as long as its modification time is unchanged,
+                  and a copy of the cached object is returned, so modifying it does not affect later calls
+    :return: mt.MT object
+    """
+    if cache:
+        return copy.deepcopy(_get_cached_mt(edi_file))
+    return mt.MT(edi_file)
+
+
+def clear_mt_cache():
+    """
+    remove all the MT objects cached by load_mt() and the penetration depth functions.
+    """
+    _MT_CACHE.clear()
+
+
+def iter_edi_files(edi_dir):
+    """
+    iterate over the paths of the edi files in a directory, in directory order.
+    Equivalent to glob.glob(os.path.join(edi_dir, '*.edi')) without the pattern matching and the intermediate list.
+    :param edi_dir: path to the directory of the edi files
+    :return: generator of the edi file paths
+    """
+    # hidden files are skipped, as glob does
+    return (os.path.join(edi_dir, name) for name in os.listdir(edi_dir)
+            if name.endswith('.edi') and not name.startswith('.'))
+
+
+def load_edi_files(edi_path, cache=False):
     edi_list = []
     if edi_path is not None:
-        edi_list = [mt.MT(os.path.join(edi_path, edi)) for edi in os.listdir(edi_path) if edi.endswith("edi")]
+        edi_list = [load_mt(os.path.join(edi_path, edi), cache=cache)
+                    for edi in os.listdir(edi_path) if edi.endswith("edi")]
     return edi_list
 
 
@@ -546,11 +596,10 @@ def get_penetration_depth_generic(edi_file_list, period_sec, whichrho='det', pto
     :param edi_file_list: edi file list of mt object list
     :param period_sec: the float number value of the period in second: 0.1, ...20.0
     :param whichrho:
-    :return: tuple of (stations, periods, penetrationdepth, lat-lons-pairs)
+    :return: tuple of (stations, periods, penetrationdepth, lat-lons), where lat-lons is an array of shape (n, 2)
     """
 
-    scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
-    _logger.debug("The scaling parameter=%.6f" % scale_param)
+    _logger.debug("The scaling parameter=%.6f", SCALE_PARAM)
 
     # per_index=0,1,2,....
     periods = []
@@ -562,7 +611,7 @@ def get_penetration_depth_generic(edi_file_list, period_sec, whichrho='det', pto
 
     for afile in edi_file_list:
         if isinstance(afile, str) and os.path.isfile(afile):
-            mt_obj = mt.MT(afile)
+            mt_obj = _get_cached_mt(afile)
         elif isinstance(afile, mt.MT):
             mt_obj = afile
         else:
@@ -601,11 +650,11 @@ def get_penetration_depth_generic(edi_file_list, period_sec, whichrho='det', pto
             if whichrho == 'det':  # the 2X2 complex Z-matrix's determinant abs value
                 # determinant value at the given period index
                 det2 = np.abs(zeta.det[per_index])
-                penetration_depth = -scale_param * np.sqrt(0.2 * per * det2 * per)
+                penetration_depth = -SCALE_PARAM * np.sqrt(0.2 * per * det2 * per)
             elif whichrho == 'zxy':
-                penetration_depth = -scale_param * np.sqrt(zeta.resistivity[per_index, 0, 1] * per)
+                penetration_depth = -SCALE_PARAM * np.sqrt(zeta.resistivity[per_index, 0, 1] * per)
             elif whichrho == 'zyx':
-                penetration_depth = -scale_param * np.sqrt(zeta.resistivity[per_index, 1, 0] * per)
+                penetration_depth = -SCALE_PARAM * np.sqrt(zeta.resistivity[per_index, 1, 0] * per)
 
             else:
                 _logger.critical(
@@ -623,7 +672,9 @@ def get_penetration_depth_generic(edi_file_list, period_sec, whichrho='det', pto
     # sort all frequencies so that they are in descending order,
     # use set to remove repeats and make an array.
     all_periods = 1.0 / np.array(sorted(list(set(all_freqs)), reverse=True))
-    print("Here is a list of ALL the periods in your edi files:\t ", all_periods)
+    _logger.info("Here is a list of ALL the periods in your edi files:\t %s", all_periods)
+
+    latlons = np.asarray(latlons, dtype=np.float64).reshape(-1, 2)
 
     return stations, periods, pendep, latlons
 
@@ -646,61 +697,242 @@ def check_period_values(period_list, ptol=0.1):
 
     _logger.debug("The Periods List to be checked : %s", period_list)
 
-    if not period_list:
+    if len(period_list) == 0:
         _logger.error("The MT periods list is empty - No relevant data found in the EDI files.")
         return False  # what is the sensible default value for this ?
 
-    p0 = period_list[0]  # the first value as a ref
+    periods = np.asarray(period_list, dtype=np.float64)
+    p0 = periods[0]  # the first value as a ref
 
     upper_bound = p0 * (1 + ptol)
     lower_bound = p0 * (1 - ptol)
-    if all((per > lower_bound and (per < upper_bound)) for per in period_list[1:]):
+    in_range = (periods[1:] > lower_bound) & (periods[1:] < upper_bound)
+    if in_range.all():
         return True
     else:
+        _logger.warning("Periods NOT Equal!!! %s != %s", p0, periods[1:][~in_range][:3])
         return False
 
-        # pcounter = 0
-        #
-        # for per in period_list:
-        #     if (per > p0 * (1 - ptol)) and (per < p0 * (1 + ptol)):  # approximately equal by <5% error
-        #         pcounter = pcounter + 1
-        #     else:
-        #         logger.warn("Periods NOT Equal!!!  %s != %s", p0, per)
-        #         return False
-        #
-        # return True
-
 
 def get_bounding_box(latlons):
     """ get min max lat lon from the list of lat-lon-pairs points"""
-    minlat = minlon = float("inf")
-    maxlat = maxlon = float("-inf")
-
-    for (lat, lon) in latlons:
-        minlat = min(minlat, lat)
-        maxlat = max(maxlat, lat)
-        minlon = min(minlon, lon)
-        maxlon = max(maxlon, lon)
+    latlons = np.asarray(latlons, dtype=np.float64)
+    minlat, minlon = latlons.min(axis=0)
+    maxlat, maxlon = latlons.max(axis=0)
 
     _logger.debug("Latitude Range: [%.5f, %.5f]", minlat, maxlat)
     _logger.debug("Longitude Range: [%.5f, %.5f]", minlon, maxlon)
 
-    # lats = [tup[0] for tup in latlons]
-    # lons = [tup[1] for tup in latlons]
-    #
-    # minlat = min(lats)
-    # maxlat = max(lats)
-    #
-    # print("Latitude Range:", minlat, maxlat)
-    #
-    # minlon = min(lons)
-    # maxlon = max(lons)
-    #
-    # print("Longitude Range:", minlon, maxlon)
-
     return (minlon, maxlon), (minlat, maxlat)
 
 
+# the results of build_depth_grid(), keyed by its arguments, in least recently used order
+_DEPTH_GRID_CACHE = OrderedDict()
+_DEPTH_GRID_CACHE_SIZE = 16
+
+
+def build_depth_grid(latlons, pendep, pixelsize=0.002, pad=1, method='linear'):
+    """
+    map the penetration depths of the stations onto a lat-lon image grid, and interpolate them over the whole grid.
+    The results are cached, so re-plotting the same stations and depths (e.g. with a different z_unit or
+    plot_station_id in Depth3D) skips the interpolation; the returned arrays should be treated as read-only.
+    :param latlons: lat-lon pairs of the stations
+    :param pendep: penetration depths of the stations
+    :param pixelsize: pixel size in lat long degree, 0.002=200meters, 0.01=1KM 1deg=100KM
+    :param pad: number of extra pixels on the top and right of the image
+    :param method: interpolation method, see interpolate_grid()
+    :return: tuple of (bbox, zdep, station_points, grid_z), where
+             bbox is the bounding box ((minlon, maxlon), (minlat, maxlat)) of the stations,
+             zdep is the float32 image of the abs penetration depths at the station pixels and np.nan elsewhere,
+             station_points is the (n, 2) array of the (row, column) indexes of the stations in the image,
+             grid_z is the interpolated image of the abs penetration depths, negative values are set to np.nan
+    """
+    latlons = np.asarray(latlons, dtype=np.float64)
+    pendep = np.asarray(pendep, dtype=np.float64)
+    key = (latlons.shape, latlons.tobytes(), pendep.tobytes(), pixelsize, pad, method)
+    result = _DEPTH_GRID_CACHE.pop(key, None)
+    if result is None:
+        result = _build_depth_grid(latlons, pendep, pixelsize, pad, method)
+    _DEPTH_GRID_CACHE[key] = result  # (re)insert as the most recently used
+    if len(_DEPTH_GRID_CACHE) > _DEPTH_GRID_CACHE_SIZE:
+        _DEPTH_GRID_CACHE.popitem(last=False)
+    return result
+
+
+def _build_depth_grid(latlons, pendep, pixelsize, pad, method):
+    """ the implementation of build_depth_grid(), latlons and pendep are float arrays """
+    bbox = get_bounding_box(latlons)
+
+    _logger.debug("Bounding Box %s", bbox)
+
+    xgrids = bbox[0][1] - bbox[0][0]
+    ygrids = bbox[1][1] - bbox[1][0]
+
+    _logger.debug("xy grids: %s %s", xgrids, ygrids)
+
+    minlat = bbox[1][0]
+    minlon = bbox[0][0]
+
+    nx = int(np.ceil(xgrids / pixelsize))
+    ny = int(np.ceil(ygrids / pixelsize))
+
+    _logger.debug("number of grids xy: %s %s", nx, ny)
+
+    # make the image slightly bigger than the (nx, ny) to contain all points
+    # avoid index out of bound
+    # pad = 1 affect the top and right of the plot. it is linked to get_index offset?
+    # todo change this part to use xy bound offset? (0.5 gride on each side?)
+    nx_padded = nx + pad
+    ny_padded = ny + pad
+
+    # single pass initialization of all pixel value as np.nan, float32 is plenty for an image of depths
+    zdep = np.full((ny_padded, nx_padded), np.nan, dtype=np.float32)
+
+    _logger.debug("zdep shape %s", zdep.shape)
+
+    # map all the stations to the grid in one go, 0-lat, 1-lon
+    ix, iy = get_index_array(latlons[:, 0], latlons[:, 1], minlat, minlon, pixelsize)
+    values = np.abs(pendep)
+    zdep[ny_padded - iy - 1, ix] = values
+
+    station_points = np.column_stack((ny_padded - iy - 1, ix))
+
+    # griddata interpolation of the zdep sample MT points.
+    # grid_x, grid_y = np.mgrid[0:95:96j, 0:83:84j]  # this syntax with
+    # complex step 96j has different meaning
+    # this is more straight forward.
+    grid_x, grid_y = np.mgrid[0:ny_padded:1, 0:nx_padded:1]
+
+    grid_z = interpolate_grid(station_points, values, grid_x, grid_y, method=method)
+
+    # method='cubic' may cause negative interp values; set them nan to make
+    # empty
+    grid_z[grid_z < 0] = np.nan
+
+    return bbox, zdep, station_points, grid_z
+
+
+# minimum number of samples along each axis required by the separable interpolation of each method.
+# Only 'cubic' is factored: the bilinear interpolation of a lattice differs from the piecewise planar 'linear' of
+# griddata inside each cell, while the cubic spline and the Clough-Tocher surface of griddata are both smooth
+# cubic interpolants of the samples (and agree exactly on linear data). The other methods always go to griddata.
+_INTERP_MIN_SAMPLES = {'cubic': 4}
+
+# Delaunay triangulations of the scattered sample points, keyed by the point layout, in LRU order
+_TRIANGULATION_CACHE = OrderedDict()
+_TRIANGULATION_CACHE_SIZE = 16
+
+# interpolators of griddata which can be built on a triangulation
+_TRIANGULATION_INTERPOLATORS = {'linear': LinearNDInterpolator, 'cubic': CloughTocher2DInterpolator}
+
+
+def get_triangulation(points):
+    """
+    get the Delaunay triangulation of the points. The triangulation only depends on the point layout,
+    so it is cached and shared by all the interpolations over the same stations (e.g. different periods).
+    :param points: (n, 2) float array of the point coordinates
+    :return: scipy.spatial.Delaunay object, should be treated as read-only
+    """
+    key = (points.shape, points.tobytes())
+    tri = _TRIANGULATION_CACHE.pop(key, None)
+    if tri is None:
+        _logger.debug("triangulating %s points", len(points))
+        tri = Delaunay(points)
+    _TRIANGULATION_CACHE[key] = tri  # (re)insert as the most recently used
+    if len(_TRIANGULATION_CACHE) > _TRIANGULATION_CACHE_SIZE:
+        _TRIANGULATION_CACHE.popitem(last=False)
+    return tri
+
+
+def interpolate_grid(points, values, grid_x, grid_y, method='linear'):
+    """
+    interpolate the sample values at points onto the rectilinear grid (grid_x, grid_y) created by np.mgrid.
+
+    For the cubic method, if the sample points form a complete rectilinear lattice, the interpolation is factored
+    into two 1D cubic spline passes (along the columns and then along the rows) which is much cheaper than the
+    triangulation based griddata, the result is a smooth cubic interpolation of the samples but not identical to
+    the Clough-Tocher interpolation of griddata.
+    Otherwise the linear and cubic interpolations are evaluated on the cached triangulation of the points
+    (see get_triangulation()), which gives the same results as griddata, and the other methods use
+    scipy.interpolate.griddata.
+    Grid points outside the range of the samples are set to np.nan, as griddata does.
+    The 'idw' method (see interpolate_idw()) skips the triangulation altogether and covers the whole grid,
+    which is faster for a small number of stations over a large grid.
+    :param points: (n, 2) array of the sample point coordinates
+    :param values: (n,) array of the sample values
+    :param grid_x: 2D array of the first coordinate of the grid, constant along axis 1
+    :param grid_y: 2D array of the second coordinate of the grid, constant along axis 0
+    :param method: nearest, linear or cubic, see scipy.interpolate.griddata, or idw
+    :return: 2D array of the interpolated values in the shape of grid_x
+    """
+    points = np.asarray(points, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    rows = np.unique(points[:, 0])
+    cols = np.unique(points[:, 1])
+    min_samples = _INTERP_MIN_SAMPLES.get(method)
+    unique_points = len(set(map(tuple, points)))
+    if min_samples is None or min(rows.size, cols.size) < min_samples \
+            or not (rows.size * cols.size == len(points) == unique_points):
+        # scattered points
+        if method == 'idw':
+            return interpolate_idw(points, values, grid_x, grid_y)
+        interpolator = _TRIANGULATION_INTERPOLATORS.get(method)
+        if interpolator is None:
+            return griddata(points, values, (grid_x, grid_y), method=method)
+        # the same as griddata, but without re-triangulating the same points
+        return interpolator(get_triangulation(points), values, fill_value=np.nan)(grid_x, grid_y)
+
+    _logger.debug("interpolating a %s x %s lattice with separable 1D interpolation", rows.size, cols.size)
+    lattice = np.empty((rows.size, cols.size))
+    lattice[np.searchsorted(rows, points[:, 0]), np.searchsorted(cols, points[:, 1])] = values
+
+    grid_rows = grid_x[:, 0]
+    grid_cols = grid_y[0, :]
+    in_rows = (grid_rows >= rows[0]) & (grid_rows <= rows[-1])
+    in_cols = (grid_cols >= cols[0]) & (grid_cols <= cols[-1])
+
+    grid_z = np.empty(grid_x.shape)
+    grid_z.fill(np.nan)
+    if in_rows.any() and in_cols.any():
+        partial = interp1d(cols, lattice, kind=method, axis=1)(grid_cols[in_cols])
+        grid_z[np.ix_(in_rows, in_cols)] = interp1d(rows, partial, kind=method, axis=0)(grid_rows[in_rows])
+    return grid_z
+
+
+def interpolate_idw(points, values, grid_x, grid_y, power=2, block_size=2 ** 20):
+    """
+    inverse distance weighting (Shepard) interpolation of the sample values at points onto the grid.
+    The cost is O(grid size * number of points) without any triangulation, the grid is processed in blocks
+    of about block_size point-sample pairs to bound the memory.
+    :param points: (n, 2) array of the sample point coordinates
+    :param values: (n,) array of the sample values
+    :param grid_x: array of the first coordinate of the grid points
+    :param grid_y: array of the second coordinate of the grid points, in the shape of grid_x
+    :param power: power of the inverse distance weights
+    :param block_size: maximum number of grid point-sample pairs evaluated at once
+    :return: array of the interpolated values in the shape of grid_x
+    """
+    points = np.asarray(points, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    flat_x = np.asarray(grid_x, dtype=np.float64).ravel()
+    flat_y = np.asarray(grid_y, dtype=np.float64).ravel()
+
+    grid_z = np.empty(flat_x.shape)
+    step = max(1, block_size // len(points))
+    for start in range(0, flat_x.size, step):
+        block = slice(start, start + step)
+        dist2 = (flat_x[block, None] - points[:, 0]) ** 2 + (flat_y[block, None] - points[:, 1]) ** 2
+        # grid points on top of a sample take the value of the sample
+        hits = dist2 == 0
+        dist2[hits] = 1.0
+        weights = dist2 ** (-0.5 * power)
+        on_sample = hits.any(axis=1)
+        weights[on_sample] = hits[on_sample]
+        grid_z[block] = weights.dot(values) / weights.sum(axis=1)
+    return grid_z.reshape(np.shape(grid_x))
+
+
 def get_index(lat, lon, minlat, minlon, pixelsize, offset=0):
     """
     compute the grid index from the lat lon float value
@@ -722,3 +954,35 @@ def get_index(lat, lon, minlat, minlon, pixelsize, offset=0):
     _logger.debug("Grid index: (%s, %s)", ix, iy)
 
     return ix + offset, iy + offset
+
+
+def _round_half_away(values):
+    """
+    round the float array to the nearest integers, with the halves rounded away from zero, as round() does.
+    The fraction is taken from the magnitude which is exact, adding 0.5 instead would round up values just
+    below a half (e.g. 0.49999999999999994).
+    """
+    magnitude = np.abs(values)
+    whole = np.floor(magnitude)
+    rounded = whole + (magnitude - whole >= 0.5)
+    return np.copysign(rounded, values).astype(np.intp)
+
+
+def get_index_array(lats, lons, minlat, minlon, pixelsize, offset=0):
+    """
+    compute the grid indexes from arrays of lat lon values, this is the vectorized version of get_index()
+    :param lats: array of lat
+    :param lons: array of lon
+    :param minlat: min lat at low left corner
+    :param minlon: min long at left
+    :param pixelsize: pixel size in lat long degree
+    :param offset: a shift of grid index. should be =0.
+    :return: a pair of integer arrays (ix, iy)
+    """
+    index_x = (np.asarray(lons, dtype=np.float64) - minlon) / pixelsize
+    index_y = (np.asarray(lats, dtype=np.float64) - minlat) / pixelsize
+
+    ix = _round_half_away(index_x)
+    iy = _round_half_away(index_y)
+
+    return ix + offset, iy + offset
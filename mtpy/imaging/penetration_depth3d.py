@@ -12,16 +12,16 @@ Author: fei.zhang@ga.gov.au
 Date:   2017-01-23
 """
 
-import glob
 import os
 import sys
+from collections import OrderedDict
 
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
 
-import mtpy.core.mt as mt
-from mtpy.imaging.penetration import get_index, load_edi_files, Depth3D
+from mtpy.imaging.penetration import build_depth_grid, get_bounding_box, get_index_array, get_penetration_depth, \
+    iter_edi_files, load_edi_files, _get_cached_mt, pool_map, Depth3D, SCALE_PARAM
 from mtpy.utils.decorator import deprecated
 from mtpy.utils.mtpylog import MtPyLog
 
@@ -34,6 +34,14 @@ from mtpy.utils.mtpylog import MtPyLog
 # config the logger
 _logger = MtPyLog.get_mtpy_logger(__name__)
 
+# apparent resistivity times period of each supported z component, keyed by the rholist entry,
+# in the order of precedence when rholist contains more than one of them
+_RHO_PERIOD = OrderedDict([
+    ('det', lambda zeta, periods: 0.2 * periods * np.abs(zeta.det) * periods),
+    ('zyx', lambda zeta, periods: zeta.resistivity[:, 1, 0] * periods),
+    ('zxy', lambda zeta, periods: zeta.resistivity[:, 0, 1] * periods)
+])
+
 
 # logger =
 # MtPyLog(path2configfile='logging.yml').get_mtpy_logger(__name__) #
@@ -132,7 +140,7 @@ def get_index2(lat, lon, ref_lat, ref_lon, pixelsize):
 #########################################################
 
 
-def plot_bar3d_depth(edifiles, per_index, whichrho='det'):
+def plot_bar3d_depth(edifiles, per_index, whichrho='det', processes=1, mode='heatmap'):
     """
     plot 3D bar of penetration depths
     For a given freq/period index of a set of edifiles/dir,
@@ -143,127 +151,89 @@ def plot_bar3d_depth(edifiles, per_index, whichrho='det'):
     :param whichrho: z component either 'det', 'zxy' or 'zyx'
     :param edifiles: an edi_dir or list of edi_files
     :param per_index: period index number 0,1,2
+    :param processes: number of processes used to read the edi files, None to use all the cpus
+    :param mode: 'heatmap' to plot the interpolated penetration depths as a 2D image over lat-lon with the stations
+                 marked, or 'bar3d' to plot a 3D bar for each station. The 3D bars are slow to render for more than a
+                 few hundred stations.
 
     :return:
     """
 
     if os.path.isdir(edifiles):
         edi_dir = edifiles  # "E:/Githubz/mtpy2/tests/data/edifiles/"
-        edifiles = glob.glob(os.path.join(edi_dir, '*.edi'))
+        edifiles = list(iter_edi_files(edi_dir))
         _logger.debug(edifiles)
     else:
         # Assume edifiles is [a list of files]
         pass
 
-    scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
-
-    _logger.debug("The scaling parameter=%.6f" % scale_param)
-
-    # per_index=0,1,2,....
-    periods = []
-    pen_depth = []
-    stations = []
-    latlons = []
-
-    for afile in edifiles:
-        mt_obj = mt.MT(afile)
-
-        latlons.append((mt_obj.lat, mt_obj.lon))
-
-        # the attribute Z
-        zeta = mt_obj.Z
-
-        if per_index >= len(zeta.freq):
-            raise Exception(
-                "Error: input period index must be less than the number of freqs in zeta.freq=%s", len(
-                    zeta.freq))
-        per = 1.0 / zeta.freq[per_index]
-        periods.append(per)
-
-        if whichrho == 'det':  # the 2X2 complex Z-matrix's determinant abs value
-            # determinant value at the given period index
-            det2 = np.abs(zeta.det[0][per_index])
-            penetration_depth = -scale_param * np.sqrt(0.2 * per * det2 * per)
-        elif whichrho == 'zxy':
-            penetration_depth = - scale_param * \
-                                np.sqrt(zeta.resistivity[per_index, 0, 1] * per)
-        elif whichrho == 'zyx':
-            penetration_depth = - scale_param * \
-                                np.sqrt(zeta.resistivity[per_index, 1, 0] * per)
-
-        pen_depth.append(penetration_depth)
-
-        stations.append(mt_obj.station)
+    stations, periods, pen_depth, latlons = get_penetration_depth(edifiles, per_index, whichrho=whichrho,
+                                                                  processes=processes)
 
     # return (stations, periods, pen_depth, latlons)
 
-    lats = [tup[0] for tup in latlons]
-    lons = [tup[1] for tup in latlons]
-    minlat = min(lats)
-    maxlat = max(lats)
-    minlon = min(lons)
-    maxlon = max(lons)
-
-    pixelsize = 0.002  # degree 0.001 = 100meters
-    shift = 3
-    ref_lat = minlat - shift * pixelsize
-    ref_lon = minlon - shift * pixelsize
-
-    xgrids = maxlon - minlon
-    ygrids = maxlat - minlat
-
-    # nx = xgrids / pixelsize
-    # ny = ygrids / pixelsize
-
-    # import matplotlib.pyplot as plt
-    # import numpy as np
-
-    fig = plt.figure()
-    ax1 = fig.add_subplot(111, projection='3d')
-
-    xpos = []  # a seq (1,2,3,4,5,6,7,8,9,10)
-    ypos = []  # a seq [2,3,4,5,1,6,2,1,7,2]
-    dz = []
-    for iter, pair in enumerate(latlons):
-        xpos.append(
-            get_index(
-                pair[0],
-                pair[1],
-                ref_lat,
-                ref_lon,
-                pixelsize)[0])
-        ypos.append(
-            get_index(
-                pair[0],
-                pair[1],
-                ref_lat,
-                ref_lon,
-                pixelsize)[1])
-        dz.append(np.abs(pen_depth[iter]))
-        # dz.append(-np.abs(pen_depth[iter]))
-
-    num_elements = len(xpos)
-    zpos = np.zeros(num_elements)  # zpos = [0,0,0,0,0,0,0,0,0,0]
-    dx = np.ones(num_elements)
-    dy = np.ones(num_elements)
-    # dz = [1,2,3,4,5,6,7,8,9,10]
-
-    # print(xpos)
-    # print(ypos)
-    # print(zpos)
-    #
-    # print(dx)
-    # print(dy)
-    # print(dz)
-    ax1.bar3d(xpos, ypos, zpos, dx, dy, dz, color='r')
-
-    # ax1
+    if mode == 'heatmap':
+        pixelsize = 0.002  # degree 0.001 = 100meters
+        bbox, zdep, station_points, grid_z = build_depth_grid(latlons, pen_depth, pixelsize)
+        minlon = bbox[0][0]
+        minlat = bbox[1][0]
+
+        # the edges of the pixels, the first row of the image is at the max lat
+        nrows, ncols = grid_z.shape
+        lon_edges = minlon + (np.arange(ncols + 1) - 0.5) * pixelsize
+        lat_edges = minlat + (np.arange(nrows + 1) - 0.5) * pixelsize
+
+        fig = plt.figure()
+        ax1 = fig.add_subplot(111)
+        mesh = ax1.pcolormesh(lon_edges, lat_edges, np.ma.masked_invalid(grid_z[::-1]), cmap=mpl.cm.jet_r)
+        # the stations
+        ax1.plot(latlons[:, 1], latlons[:, 0], 'kv', markersize=6)
+        fig.colorbar(mesh, ax=ax1).set_label('Penetration Depth (m)', fontsize=16)
+
+        plt.xlabel('Longitude', fontsize=16)
+        plt.ylabel('Latitude', fontsize=16)
+    elif mode == 'bar3d':
+        (minlon, maxlon), (minlat, maxlat) = get_bounding_box(latlons)
+
+        pixelsize = 0.002  # degree 0.001 = 100meters
+        shift = 3
+        ref_lat = minlat - shift * pixelsize
+        ref_lon = minlon - shift * pixelsize
+
+        xgrids = maxlon - minlon
+        ygrids = maxlat - minlat
+
+        # nx = xgrids / pixelsize
+        # ny = ygrids / pixelsize
+
+        # import matplotlib.pyplot as plt
+        # import numpy as np
+
+        from mpl_toolkits.mplot3d import Axes3D  # register the 3d projection
+
+        fig = plt.figure()
+        ax1 = fig.add_subplot(111, projection='3d')
+
+        # grid indexes of all the stations in one go
+        xpos, ypos = get_index_array(latlons[:, 0], latlons[:, 1], ref_lat, ref_lon, pixelsize)
+        dz = np.abs(pen_depth)
+
+        num_elements = len(xpos)
+        zpos = np.zeros(num_elements)  # zpos = [0,0,0,0,0,0,0,0,0,0]
+        dx = np.ones(num_elements)
+        dy = np.ones(num_elements)
+        # dz = [1,2,3,4,5,6,7,8,9,10]
+        ax1.bar3d(xpos, ypos, zpos, dx, dy, dz, color='r')
+
+        # ax1
+        plt.xlabel('Longitude(deg-grid)', fontsize=16)
+        plt.ylabel('Latitude(deg-grid)', fontsize=16)
+    else:
+        raise Exception("unsupported plot mode: %s" % mode)
 
     plt.title(
         'Penetration Depth (Meter) Across Stations for period= %6.3f Seconds' %
         periods[0], fontsize=16)
-    plt.xlabel('Longitude(deg-grid)', fontsize=16)
-    plt.ylabel('Latitude(deg-grid)', fontsize=16)
     # plt.zlabel('Penetration Depth (m)')
     # bar_width = 0.4
     # plt.xticks(index + bar_width / 2, stations, rotation='horizontal', fontsize=16)
@@ -285,66 +255,52 @@ def get_penetration_depths_from_edi_file(edifile, rholist=['det']):
     """
     _logger.debug("processing the edi file %s", edifile)
 
-    mt_obj = mt.MT(edifile)
+    mt_obj = _get_cached_mt(edifile)
     zeta = mt_obj.Z  # the attribute Z represent the impedance tensor 2X2 matrix
     freqs = zeta.freq  # frequencies
 
-    scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
-
-    _logger.debug("the scale parameter= %s", scale_param)
+    rho = next((comp for comp in _RHO_PERIOD if comp in rholist), None)
+    if rho is None:
+        raise Exception("unsupported method to compute penetration depth: %s" % rholist)
 
     # The periods array
     periods = 1.0 / freqs
 
-    if 'zxy' in rholist:
-        # One of the 4-components: XY
-        penetration_depth = scale_param * \
-                            np.sqrt(zeta.resistivity[:, 0, 1] * periods)
-
-    if 'zyx' in rholist:
-        penetration_depth = scale_param * \
-                            np.sqrt(zeta.resistivity[:, 1, 0] * periods)
-
-    if 'det' in rholist:
-        # determinant
-        det2 = np.abs(zeta.det[0])
-        penetration_depth = scale_param * \
-                            np.sqrt(0.2 * periods * det2 * periods)
+    penetration_depth = SCALE_PARAM * np.sqrt(_RHO_PERIOD[rho](zeta, periods))
 
     latlong_d = (mt_obj.lat, mt_obj.lon, periods, penetration_depth)
     return latlong_d
 
 
-def create_csv_file(edi_dir, outputcsv=None, zcomponent='det'):
+def create_csv_file(edi_dir, outputcsv=None, zcomponent='det', processes=1):
     """ Loop over all edi files, and create a csv file with columns:
     lat, lon, pendepth0, pendepth1, ...
     :param edi_dir: path_to_edifiles_dir
     :param zcomponent: det | zxy  | zyx
     :param outputcsv: path2output.csv file
-    :return:
+    :param processes: number of processes used to read the edi files, None to use all the cpus
+    :return: array of the rows written to the csv file, [lat, lon, pendepth0, pendepth1, ...]
     """
-    import csv
+    edi_files = iter_edi_files(edi_dir)
 
-    edi_files = glob.glob(os.path.join(edi_dir, "*.edi"))
+    _logger.debug("Reading the edi files in %s", edi_dir)
 
-    _logger.debug(edi_files)
+    if processes != 1:
+        edi_depths = pool_map(get_penetration_depths_from_edi_file, edi_files, processes)
+    else:
+        edi_depths = [get_penetration_depths_from_edi_file(afile) for afile in edi_files]
 
     # the first period list as a reference for checking other stations period
     periods_list0 = None
-    latlon_dep = []  # CSV to be returned
-    for afile in edi_files:
-        # for efile in edi_files[:2]:
-        _logger.debug("processing %s", afile)
-        lat, lon, per, depths = get_penetration_depths_from_edi_file(afile)
+    kept_depths = []  # (lat, lon, depths) of the stations with the same periods
+    for lat, lon, per, depths in edi_depths:
         if periods_list0 is None:
             periods_list0 = per  # initial value assignment
-            depth_string = ','.join(['%.2f' % num for num in depths])
-            latlon_dep.append((lat, lon, depth_string))
+            kept_depths.append((lat, lon, depths))
 
-        # same length and same values.
-        elif len(per) == len(periods_list0) and (per == periods_list0).all():
-            depth_string = ','.join(['%.2f' % num for num in depths])
-            latlon_dep.append((lat, lon, depth_string))
+        # same shape and same values.
+        elif np.array_equal(per, periods_list0):
+            kept_depths.append((lat, lon, depths))
         else:
             _logger.error(
                 "MT Periods Not Equal !! %s VS %s",
@@ -353,15 +309,20 @@ def create_csv_file(edi_dir, outputcsv=None, zcomponent='det'):
             # raise Exception ("MTPy Exception: Periods Not Equal")
             # pass this edi, let's continue
 
+    num_periods = 0 if periods_list0 is None else len(periods_list0)
+    latlon_dep = np.empty((len(kept_depths), 2 + num_periods))  # CSV to be returned
+    for ii, (lat, lon, depths) in enumerate(kept_depths):
+        latlon_dep[ii, 0] = lat
+        latlon_dep[ii, 1] = lon
+        latlon_dep[ii, 2:] = depths
+
     # logger.debug(latlon_dep)
 
     if outputcsv is None:
         outputcsv = r"E:/tmp/MT_pen_depth.csv"
 
     _logger.info("Saving to csv file: %s", outputcsv)
-    with open(outputcsv, "wb") as f:
-        writer = csv.writer(f)
-        writer.writerows(latlon_dep)
+    np.savetxt(outputcsv, latlon_dep, fmt=['%.6f', '%.6f'] + ['%.2f'] * num_periods, delimiter=',')
 
     return latlon_dep
 
@@ -383,7 +344,7 @@ def create_shapefile(edi_dir, outputfile=None, zcomponent='det'):
 def plot_many_periods(edidir, n_periods=5):
     from mtpy.core.edi_collection import EdiCollection
 
-    edilist = glob.glob(os.path.join(edidir, '*.edi'))
+    edilist = list(iter_edi_files(edidir))
 
     ediset = EdiCollection(edilist)
     for period_sec in ediset.all_unique_periods[:n_periods]:
@@ -391,8 +352,8 @@ def plot_many_periods(edidir, n_periods=5):
             # This will enable the loop continue even though for some freq,
             #  cannot interpolate due to not enough data points
             plot_latlon_depth_profile(edidir, period_sec, zcomponent='det', showfig=False)
-        except Exception, exwhy:
-            print(exwhy.message)
+        except Exception as exwhy:
+            _logger.warning("Unable to plot the period %s: %s", period_sec, exwhy)
 
 
 # =============================================================================================
@@ -10,6 +10,7 @@ Revision History:
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from collections import OrderedDict
 from matplotlib.ticker import FormatStrFormatter
 import mtpy.utils.gis_tools as gis_tools
 import matplotlib.colors as colors
@@ -25,6 +26,37 @@ from mtpy.utils.mtpylog import MtPyLog
 # config the logger
 # _logger = MtPyLog.get_mtpy_logger(__name__)
 
+# the MTplot objects of the edi files read by load_mt_list(), keyed by the
+# paths and modification times of the files, in least recently used order
+_MT_LIST_CACHE = OrderedDict()
+_MT_LIST_CACHE_SIZE = 8
+
+
+def load_mt_list(fn_list):
+    """
+    read a list of edi files into MTplot objects, as mtplottools.get_mtlist.
+    The objects are cached for the same files, in the same order, as long as
+    the modification times of the files are unchanged, so they are shared by
+    the callers and should be treated as read-only.
+    :param fn_list: full paths to the .edi files
+    :return: list of MTplot objects
+    """
+    key = tuple((os.path.abspath(fn), os.path.getmtime(fn)) for fn in fn_list)
+    mt_list = _MT_LIST_CACHE.pop(key, None)
+    if mt_list is None:
+        mt_list = tuple(mtpl.get_mtlist(fn_list=fn_list))
+    _MT_LIST_CACHE[key] = mt_list  # (re)insert as the most recently used
+    if len(_MT_LIST_CACHE) > _MT_LIST_CACHE_SIZE:
+        _MT_LIST_CACHE.popitem(last=False)
+    return list(mt_list)
+
+
+def clear_mt_list_cache():
+    """
+    forget the MTplot objects cached by load_mt_list()
+    """
+    _MT_LIST_CACHE.clear()
+
 
 # ==============================================================================
 
@@ -38,6 +70,12 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
         **fn_list** : list of strings
                           full paths to .edi files to plot
 
+        **cache_edi** : [ True | False ]
+                        reuse the MTplot objects of fn_list read before by
+                        load_mt_list() for the same, unchanged files.  The
+                        objects are shared, setting rot_z rotates them for
+                        every user.  *default* is False
+
         **z_object** : class mtpy.core.z.Z
                       object of mtpy.core.z.  If this is input be sure the
                       attribute z.freq is filled.  *default* is None
@@ -374,13 +412,17 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
         tipper_object_list = kwargs.pop('tipper_object_list', None)
         mt_object_list = kwargs.pop('mt_object_list', None)
         res_object_list = kwargs.pop('res_object_list', None)
+        cache_edi = kwargs.pop('cache_edi', False)
 
         # ----set attributes for the class-------------------------
-        self.mt_list = mtpl.get_mtlist(fn_list=fn_list,
-                                       res_object_list=res_object_list,
-                                       z_object_list=z_object_list,
-                                       tipper_object_list=tipper_object_list,
-                                       mt_object_list=mt_object_list)
+        if fn_list is not None and cache_edi:
+            self.mt_list = load_mt_list(fn_list)
+        else:
+            self.mt_list = mtpl.get_mtlist(fn_list=fn_list,
+                                           res_object_list=res_object_list,
+                                           z_object_list=z_object_list,
+                                           tipper_object_list=tipper_object_list,
+                                           mt_object_list=mt_object_list)
 
         # set the freq to plot
         self.plot_freq = kwargs.pop('plot_freq', 1.0)
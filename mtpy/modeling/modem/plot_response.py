@@ -10,17 +10,208 @@ ModEM
 
 """
 
+import io
 import os
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
-from matplotlib import pyplot as plt, gridspec as gridspec
-from matplotlib.ticker import MultipleLocator
+from matplotlib import pyplot as plt, gridspec as gridspec, rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import colorConverter
+from matplotlib.figure import Figure
+from matplotlib.ticker import Formatter, MaxNLocator, MultipleLocator
+from matplotlib.transforms import Affine2D, Bbox, TransformedBbox
 
 from mtpy.imaging import mtplottools as mtplottools
 from mtpy.modeling.modem.data import Data
+from mtpy.utils.mtpylog import MtPyLog
 
 __all__ = ['PlotResponse']
 
+# the attributes of PlotResponse, other than the colors, markers, marker sizes
+# and line widths, that redraw_plot() needs to rebuild the figures for
+_LAYOUT_ATTRIBUTES = ('data_fn', 'resp_fn', 'plot_type', 'plot_style',
+                      'plot_component', 'plot_z', 'batched', 'log10_z',
+                      'backend', 'font_size', 'fig_size', 'fig_dpi',
+                      'e_capsize', 'e_capthick', 'ylabel_pad',
+                      'subplot_wspace', 'subplot_hspace', 'subplot_left',
+                      'subplot_right', 'subplot_top', 'subplot_bottom',
+                      'legend_loc', 'legend_pos', 'legend_marker_scale',
+                      'legend_border_axes_pad', 'legend_label_spacing',
+                      'legend_handle_text_pad', 'legend_border_pad',
+                      'res_limits_d', 'res_limits_od', 'phase_limits_d',
+                      'phase_limits_od', 'tipper_limits')
+
+# the Data objects read by _load_data(), keyed by the absolute path of the
+# file, in least recently used order
+_DATA_CACHE = OrderedDict()
+_DATA_CACHE_SIZE = 32
+
+
+def _load_data(data_fn):
+    """
+    read a ModEM data or response file into a Data object.
+
+    The Data objects are cached and the same object is returned as long as
+    the modification time and size of the file are unchanged, so the
+    returned object should be treated as read-only.
+    """
+    path = os.path.abspath(data_fn)
+    stat = os.stat(path)
+    key = (stat.st_mtime, stat.st_size)
+    cached = _DATA_CACHE.pop(path, None)
+    if cached is not None and cached[0] == key:
+        data_obj = cached[1]
+    else:
+        data_obj = Data()
+        data_obj.read_data_file(data_fn)
+    _DATA_CACHE[path] = (key, data_obj)  # (re)insert as the most recently used
+    if len(_DATA_CACHE) > _DATA_CACHE_SIZE:
+        _DATA_CACHE.popitem(last=False)
+    return data_obj
+
+
+class _InnerTickFormatter(Formatter):
+    """
+    label the ticks with their values, except the first and the last ticks
+    which are left blank so that the labels of stacked axes do not overlap.
+
+    With log10=True the tick values are exponents and labeled as powers of 10.
+    """
+
+    def __init__(self, log10=False):
+        self.log10 = log10
+
+    def __call__(self, x, pos=None):
+        if pos is not None and pos in (0, len(self.locs) - 1):
+            return ''
+        if self.log10:
+            return '$10^{%g}$' % x
+        return str(x)
+
+
+def _scaled_impedance(z_array, freq, z_err_array=None, out=None):
+    """
+    magnitudes of the real and imaginary parts of the impedance scaled by
+    1/sqrt(freq), and of the scaled error, as plotted with plot_z
+
+    :param out: optional tuple of 2 float64 arrays of the shape of z_array,
+                the real and imaginary magnitudes are computed in place in
+                them instead of in new arrays
+    :return: tuple of (real, real error, imaginary, imaginary error), the
+             real and imaginary parts share the same error array, which is
+             None when z_err_array is None
+    """
+    # 1/sqrt(f) broadcast over the 2x2 components
+    scaling = (1. / np.sqrt(freq))[:, np.newaxis, np.newaxis]
+    if out is None:
+        out = (np.empty(z_array.shape), np.empty(z_array.shape))
+    real, imag = out
+    np.multiply(z_array.real, scaling, out=real)
+    np.abs(real, out=real)
+    np.multiply(z_array.imag, scaling, out=imag)
+    np.abs(imag, out=imag)
+    if z_err_array is None:
+        scaled_err = None
+    else:
+        scaled_err = abs(z_err_array * scaling)
+    return real, scaled_err, imag, scaled_err
+
+
+def _normalized_residual(data, response, error):
+    """
+    residual of the response normalized by the data error, computed in a
+    single array.  As with np.nan_to_num((data - response) / error), the
+    points without error and residual (masked points) are set to 0, and the
+    points without error but with a residual to the largest float.
+    """
+    residual = np.subtract(data, response)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(residual, error, out=residual)
+    return np.nan_to_num(residual)
+
+
+def _residual_rms(z_residual, t_residual=None):
+    """
+    spread (standard deviation) of the normalized residual of each impedance
+    component, xx, xy, yx, yy, and of each tipper component, x, y, when
+    t_residual is given, computed in a single reduction
+
+    :return: tuple of floats
+    """
+    n_periods = z_residual.shape[0]
+    residual = z_residual.reshape(n_periods, 4)
+    if t_residual is not None:
+        residual = np.concatenate((residual, t_residual.reshape(n_periods, 2)), axis=1)
+    return tuple(residual.std(axis=0).tolist())
+
+
+# the legend labels made by _response_labels(), keyed by the rms values
+_LABEL_CACHE = {}
+_LABEL_CACHE_SIZE = 1024
+
+
+def _response_labels(rms):
+    """
+    legend labels of the model response of the impedance components xx, xy,
+    yx, yy and, if rms has 6 values, of the tipper components x and y
+
+    :param rms: tuple of the rms of the normalized residual of each component
+    :return: tuple of the labels
+    """
+    labels = _LABEL_CACHE.get(rms)
+    if labels is None:
+        names = ['$Z^m_{xx}$ ', '$Z^m_{xy}$ ', '$Z^m_{yx}$ ', '$Z^m_{yy}$ ',
+                 '$T^m_{x}$ ', '$T^m_{y}$']
+        labels = tuple(name + 'rms={0:.2f}'.format(value)
+                       for name, value in zip(names, rms))
+        if len(_LABEL_CACHE) >= _LABEL_CACHE_SIZE:
+            _LABEL_CACHE.clear()
+        _LABEL_CACHE[rms] = labels
+    return labels
+
+
+def _savefig_dpi(fig, dpi):
+    """
+    dpi argument of savefig to save fig at dpi, 'figure' when it is the dpi
+    of the figure, so savefig does not have to rescale the figure
+    """
+    if dpi is None or dpi == fig.get_dpi():
+        return 'figure'
+    return dpi
+
+
+def _write_file(file_name, data):
+    """
+    write the bytes of a rendered figure to a file
+    """
+    with open(file_name, 'wb') as fid:
+        fid.write(data)
+
+
+# stands for the errorbar container of a component without points, indexed
+# as (line, caplines, barlinecols)
+_NO_ERRORBAR = (None, (None, None), (None,))
+
+
+def _plot_line(ax, x_array, y_array, color='k', marker='x', ms=2, ls=':',
+               lw=1, **kwargs):
+    """
+    plot a line with markers styled as mtplottools.plot_errorbar, for the
+    values without errors such as the model responses.  A single Line2D is
+    much cheaper to make and draw than an errorbar container.
+
+    :return: tuple of the line, indexed as the errorbar container, the line
+             is None when there are no values
+    """
+    if len(x_array) == 0:
+        return (None,)
+    line = ax.plot(x_array, y_array, marker=marker, ms=ms, mfc='None',
+                   mew=lw, mec=color, ls=ls, color=color, lw=lw)[0]
+    return (line,)
+
 
 class PlotResponse(object):
     """
@@ -41,6 +232,17 @@ class PlotResponse(object):
     ======================== ==================================================
     Attributes               Description
     ======================== ==================================================
+    backend                  [ None | 'agg' ] None to make the figures with
+                             pyplot and show them, 'agg' to render them off
+                             screen with the Agg canvas, without pyplot and
+                             any GUI, for saving to files (*default* is None)
+    batched                  [ True | False ] True to plot each station in
+                             3 axes (resistivity, phase and tipper) with the
+                             components side by side and the lines of each
+                             axes drawn as a single collection, which is
+                             much faster for many stations, without the
+                             legends and error bar caps, and with shared y
+                             limits for the components (*default* is False)
     color_mode               [ 'color' | 'bw' ] color or black and white plots
     cted                     color for data TE mode
     ctem                     color for data TM mode
@@ -56,6 +258,10 @@ class PlotResponse(object):
     fig_size                 size of figure in inches (*default* is [6, 6])
     font_size                size of font for tick labels, axes labels are
                              font_size+2 (*default* is 7)
+    log10_z                  [ True | False ] True to plot the log10 of the
+                             impedance on linear axes instead of the
+                             impedance on log axes, which is faster to draw,
+                             only used with plot_z (*default* is False)
     legend_border_axes_pad   padding between legend box and axes
     legend_border_pad        padding between border of legend and symbols
     legend_handle_text_pad   padding between text labels and symbols of legend
@@ -87,6 +293,10 @@ class PlotResponse(object):
     resp_object              WSResponse object for resp_fn, or list of
                              WSResponse objects if resp_fn is a list of
                              response files
+    save_threads             number of threads writing the figures saved by
+                             plot(save_dir), with more than 1 the figures are
+                             rendered to memory and written to disk while the
+                             next stations are plotted (*default* is 1)
     station_fn               full path to station file written by WSStation
     subplot_bottom           space between axes and bottom of figure
     subplot_hspace           space between subplots in vertical direction
@@ -98,6 +308,7 @@ class PlotResponse(object):
     """
 
     def __init__(self, data_fn=None, resp_fn=None, **kwargs):
+        self._logger = MtPyLog.get_mtpy_logger(self.__class__.__name__)
         self.data_fn = data_fn
         self.resp_fn = resp_fn
 
@@ -174,19 +385,64 @@ class PlotResponse(object):
         self.plot_yn = kwargs.pop('plot_yn', 'y')
         self.plot_z = kwargs.pop('plot_z', True)
         self.ylabel_pad = kwargs.pop('ylabel_pad', 1.25)
-
+        self.batched = kwargs.pop('batched', False)
+        self.log10_z = kwargs.pop('log10_z', False)
+        self.backend = kwargs.pop('backend', None)
+        self.save_threads = kwargs.pop('save_threads', 1)
+        if self.backend not in (None, 'agg'):
+            raise ValueError("backend has to be None or 'agg'")
+
+        self.fig = None
         self.fig_list = []
 
+        # (figure, style, errorbar container) of the plotted lines and
+        # (figure, axes, handles, labels, keywords) of their legends, restyled
+        # by redraw_plot(), and the backgrounds of the figures without them
+        self._line_refs = []
+        self._legend_refs = []
+        self._backgrounds = {}
+        # the layout attributes of the last plot(), see _get_layout_state()
+        self._layout_state = None
+
+        # (figure, bounding box) of the last figure saved with tight=True
+        self._tight_bbox = None
+
+        # the Z objects whose resistivity and phase were computed by
+        # _compute_resistivity_phase(), keyed by id, in least recently used order
+        self._rp_cache = OrderedDict()
+        self._rp_cache_size = 1024
+
+        # arrays reused by _scaled_impedance() for the data and the responses
+        # of every station, keyed by (role, shape)
+        self._z_buffers = {}
+
+        # masks and periods of the non zero points of each station, see
+        # _station_masks()
+        self._mask_cache = {}
+
         # if self.plot_yn == 'y':
         #     self.plot()
 
-    def plot(self):
+    def plot(self, save_dir=None, file_format='png'):
         """
         plot
+
+        :param save_dir: directory to save the figure of each station to, as
+                         save_dir/station.file_format, right after it is
+                         drawn.  The figure and axes are then reused for the
+                         next station instead of making a new figure for
+                         each station.
+        :param file_format: format of the saved figures
         """
 
-        self.data_object = Data()
-        self.data_object.read_data_file(self.data_fn)
+        self.data_object = _load_data(self.data_fn)
+        self._line_refs = []
+        self._legend_refs = []
+        self._backgrounds = {}
+        self._layout_state = None
+        self._tight_bbox = None
+        # the figures of this plot, plt.figure(station) returns the figure of a previous plot
+        self.fig_list = []
 
         # get shape of impedance tensors
         ns = len(self.data_object.mt_dict.keys())
@@ -195,14 +451,10 @@ class PlotResponse(object):
         if self.resp_fn != None:
             self.resp_object = []
             if type(self.resp_fn) is not list:
-                resp_obj = Data()
-                resp_obj.read_data_file(self.resp_fn)
-                self.resp_object = [resp_obj]
+                self.resp_object = [_load_data(self.resp_fn)]
             else:
                 for rfile in self.resp_fn:
-                    resp_obj = Data()
-                    resp_obj.read_data_file(rfile)
-                    self.resp_object.append(resp_obj)
+                    self.resp_object.append(_load_data(rfile))
 
         # get number of response files
         nr = len(self.resp_object)
@@ -210,9 +462,8 @@ class PlotResponse(object):
         if type(self.plot_type) is list:
             ns = len(self.plot_type)
 
-        # --> set default font size
-        plt.rcParams['font.size'] = self.font_size
-
+        # font sizes are given to the text artists, so the global rcParams
+        # are left alone
         fontdict = {'size': self.font_size + 2, 'weight': 'bold'}
         if self.plot_z:
             h_ratio = [1, 1, .5]
@@ -223,7 +474,8 @@ class PlotResponse(object):
         line_list = []
         label_list = []
 
-        # --> make key word dictionaries for plotting
+        # --> make key word dictionaries for plotting the data and the model
+        # responses, once for all the stations
         kw_xx = {'color': self.cted,
                  'marker': self.mted,
                  'ms': self.ms,
@@ -240,495 +492,846 @@ class PlotResponse(object):
                  'e_capsize': self.e_capsize,
                  'e_capthick': self.e_capthick}
 
+        kw_model_xx = {'color': self.ctem,
+                       'marker': self.mtem,
+                       'ms': self.ms_r,
+                       'ls': ':',
+                       'lw': self.lw_r,
+                       'e_capsize': self.e_capsize,
+                       'e_capthick': self.e_capthick}
+
+        kw_model_yy = {'color': self.ctmm,
+                       'marker': self.mtmm,
+                       'ms': self.ms_r,
+                       'ls': ':',
+                       'lw': self.lw_r,
+                       'e_capsize': self.e_capsize,
+                       'e_capthick': self.e_capthick}
+
+        # key words of the legends of the model responses
+        legend_kwargs = {'loc': self.legend_loc,
+                         'bbox_to_anchor': self.legend_pos,
+                         'markerscale': self.legend_marker_scale,
+                         'borderaxespad': self.legend_border_axes_pad,
+                         'labelspacing': self.legend_label_spacing,
+                         'handletextpad': self.legend_handle_text_pad,
+                         'borderpad': self.legend_border_pad,
+                         'prop': {'size': max(self.font_size, 5)}}
+
+        # key words of the legends naming the tipper components
+        tipper_legend_kwargs = {'loc': 'upper left',
+                                'markerscale': .01,
+                                'borderaxespad': .05,
+                                'labelspacing': .01,
+                                'handletextpad': .05,
+                                'borderpad': .05,
+                                'prop': {'size': max(self.font_size, 6)}}
+
         if self.plot_type != '1':
             pstation_list = []
             if type(self.plot_type) is not list:
                 self.plot_type = [self.plot_type]
+            # names to look for in the station names, and station numbers
+            wanted_names = set(str(pstation) for pstation in self.plot_type)
+            wanted_numbers = None
             for ii, station in enumerate(self.data_object.mt_dict.keys()):
                 if type(station) is not int:
-                    for pstation in self.plot_type:
-                        if station.find(str(pstation)) >= 0:
-                            pstation_list.append(station)
+                    if station in wanted_names or \
+                            any(name in station for name in wanted_names):
+                        pstation_list.append(station)
                 else:
-                    for pstation in self.plot_type:
-                        if station == int(pstation):
-                            pstation_list.append(ii)
+                    if wanted_numbers is None:
+                        wanted_numbers = set(int(pstation) for pstation in self.plot_type)
+                    if station in wanted_numbers:
+                        pstation_list.append(ii)
         else:
             pstation_list = self.data_object.mt_dict.keys()
 
-        for jj, station in enumerate(pstation_list):
-            z_obj = self.data_object.mt_dict[station].Z
-            t_obj = self.data_object.mt_dict[station].Tipper
-            period = self.data_object.period_list
-            print 'Plotting: {0}'.format(station)
+        # threads writing the saved figures to disk
+        writer = None
+        if save_dir is not None and self.save_threads > 1:
+            writer = ThreadPool(self.save_threads)
+        writes = []
+
+        try:
+            fig = None
+            for jj, station in enumerate(pstation_list):
+                z_obj = self.data_object.mt_dict[station].Z
+                t_obj = self.data_object.mt_dict[station].Tipper
+                period = self.data_object.period_list
+                self._logger.info('Plotting: %s', station)
+
+                # convert to apparent resistivity and phase
+                self._compute_resistivity_phase(z_obj)
+
+                # find locations where points have been masked, and the periods
+                # of the points of each component, shared by the data and the
+                # responses
+                ((nzxx, nzxy, nzyx, nzyy, ntx, nty),
+                 (pxx, pxy, pyx, pyy, ptx, pty)) = self._station_masks(station, z_obj,
+                                                                       t_obj, period)
+
+                # convert to apparent resistivity and phase
+                if self.plot_z:
+                    z_buffers = self._impedance_buffers('data', z_obj.z.shape)
+                    (plot_res, plot_res_err,
+                     plot_phase, plot_phase_err) = _scaled_impedance(z_obj.z, z_obj.freq,
+                                                                     z_obj.z_err, z_buffers)
+                    h_ratio = [1, 1, .5]
+
+                    if self.log10_z and not self.batched:
+                        # first order error of the log10 values
+                        with np.errstate(divide='ignore', invalid='ignore'):
+                            plot_res_err = plot_res_err / (plot_res * np.log(10))
+                            plot_phase_err = plot_phase_err / (plot_phase * np.log(10))
+                            plot_res = np.log10(plot_res)
+                            plot_phase = np.log10(plot_phase)
+
+                elif not self.plot_z:
+                    plot_res = z_obj.resistivity
+                    plot_res_err = z_obj.resistivity_err
+                    plot_phase = z_obj.phase
+                    plot_phase_err = z_obj.phase_err
+                    h_ratio = [1.5, 1, .5]
+
+                    try:
+                        self.res_limits_d = (10 ** (np.floor(np.log10(min([plot_res[nzxx, 0, 0].min(),
+                                                                           plot_res[nzyy, 1, 1].min()])))),
+                                             10 ** (np.ceil(np.log10(max([plot_res[nzxx, 0, 0].max(),
+                                                                          plot_res[nzyy, 1, 1].max()])))))
+                    except ValueError:
+                        self.res_limits_d = None
+                    try:
+                        self.res_limits_od = (10 ** (np.floor(np.log10(min([plot_res[nzxy, 0, 1].min(),
+                                                                            plot_res[nzyx, 1, 0].min()])))),
+                                              10 ** (np.ceil(np.log10(max([plot_res[nzxy, 0, 1].max(),
+                                                                           plot_res[nzyx, 1, 0].max()])))))
+                    except ValueError:
+                        self.res_limits_od = None
+
+                # make figure, the figure of the previous station can be reused
+                # once it has been saved
+                reuse = save_dir is not None and fig is not None
+                if not reuse:
+                    fig = self._new_figure(station)
+                else:
+                    self._line_refs = [ref for ref in self._line_refs if ref[0] is not fig]
+                    self._legend_refs = [ref for ref in self._legend_refs if ref[0] is not fig]
+                    if self.batched:
+                        fig.clf()
+                fig.suptitle(str(station), fontdict=fontdict)
+
+                # set the grid of subplots
+                self.plot_tipper = bool(np.any(t_obj.tipper))
+                if self.plot_tipper:
+                    # real and imaginary parts of the points of both components
+                    t_values = np.concatenate((t_obj.tipper[ntx, 0, 0],
+                                               t_obj.tipper[nty, 0, 1]))
+                    t_values = np.concatenate((t_values.real, t_values.imag))
+                    self.tipper_limits = (np.round(t_values.min(), 1),
+                                          np.round(t_values.max(), 1))
+
+                if self.batched:
+                    self._plot_station_batched(fig, station, period, h_ratio,
+                                               (nzxx, nzxy, nzyx, nzyy),
+                                               (ntx, nty), plot_res, plot_res_err,
+                                               plot_phase, plot_phase_err, t_obj)
+                    if save_dir is not None:
+                        writes.append(self._save_station_figure(fig, station, save_dir,
+                                                                file_format, writer))
+                    if self.backend is None:
+                        plt.show()
+                    continue
+
+                if reuse:
+                    # clear the axes of the previous station
+                    for ax in self.ax_list:
+                        ax.cla()
+                    (axrxx, axrxy, axryx, axryy,
+                     axpxx, axpxy, axpyx, axpyy,
+                     axtxr, axtxi, axtyr, axtyi) = self.ax_list
+                else:
+                    gs = gridspec.GridSpec(3, 4,
+                                           wspace=self.subplot_wspace,
+                                           left=self.subplot_left,
+                                           top=self.subplot_top,
+                                           bottom=self.subplot_bottom,
+                                           right=self.subplot_right,
+                                           hspace=self.subplot_hspace,
+                                           height_ratios=h_ratio)
+
+                    axrxx = fig.add_subplot(gs[0, 0])
+                    axrxy = fig.add_subplot(gs[0, 1], sharex=axrxx)
+                    axryx = fig.add_subplot(gs[0, 2], sharex=axrxx, sharey=axrxy)
+                    axryy = fig.add_subplot(gs[0, 3], sharex=axrxx, sharey=axrxx)
+
+                    axpxx = fig.add_subplot(gs[1, 0])
+                    axpxy = fig.add_subplot(gs[1, 1], sharex=axrxx)
+                    axpyx = fig.add_subplot(gs[1, 2], sharex=axrxx)
+                    axpyy = fig.add_subplot(gs[1, 3], sharex=axrxx)
+
+                    axtxr = fig.add_subplot(gs[2, 0], sharex=axrxx)
+                    axtxi = fig.add_subplot(gs[2, 1], sharex=axrxx, sharey=axtxr)
+                    axtyr = fig.add_subplot(gs[2, 2], sharex=axrxx)
+                    axtyi = fig.add_subplot(gs[2, 3], sharex=axrxx, sharey=axtyr)
+
+                    self.ax_list = [axrxx, axrxy, axryx, axryy,
+                                    axpxx, axpxy, axpyx, axpyy,
+                                    axtxr, axtxi, axtyr, axtyi]
+
+                # ---------plot the apparent resistivity-----------------------------------
+                # plot each component in its own subplot
+                # plot data response
+                erxx = self._plot_component(axrxx, pxx, nzxx, plot_res, plot_res_err, (0, 0), kw_xx)
+                erxy = self._plot_component(axrxy, pxy, nzxy, plot_res, plot_res_err, (0, 1), kw_xx)
+                eryx = self._plot_component(axryx, pyx, nzyx, plot_res, plot_res_err, (1, 0), kw_yy)
+                eryy = self._plot_component(axryy, pyy, nzyy, plot_res, plot_res_err, (1, 1), kw_yy)
+                # plot phase
+                epxx = self._plot_component(axpxx, pxx, nzxx, plot_phase, plot_phase_err, (0, 0), kw_xx)
+                epxy = self._plot_component(axpxy, pxy, nzxy, plot_phase, plot_phase_err, (0, 1), kw_xx)
+                epyx = self._plot_component(axpyx, pyx, nzyx, plot_phase, plot_phase_err, (1, 0), kw_yy)
+                epyy = self._plot_component(axpyy, pyy, nzyy, plot_phase, plot_phase_err, (1, 1), kw_yy)
+
+                # plot tipper
+                if self.plot_tipper:
+                    ertx = self._plot_component(axtxr, ptx, ntx, t_obj.tipper.real,
+                                                t_obj.tipper_err, (0, 0), kw_xx)
+                    erty = self._plot_component(axtyr, pty, nty, t_obj.tipper.real,
+                                                t_obj.tipper_err, (0, 1), kw_yy)
+
+                    eptx = self._plot_component(axtxi, ptx, ntx, t_obj.tipper.imag,
+                                                t_obj.tipper_err, (0, 0), kw_xx)
+                    epty = self._plot_component(axtyi, pty, nty, t_obj.tipper.imag,
+                                                t_obj.tipper_err, (0, 1), kw_yy)
+
+                data_lines = [('xx', erxx), ('xx', erxy), ('yy', eryx), ('yy', eryy),
+                              ('xx', epxx), ('xx', epxy), ('yy', epyx), ('yy', epyy)]
+                if self.plot_tipper:
+                    data_lines += [('xx', ertx), ('yy', erty), ('xx', eptx), ('yy', epty)]
+                self._line_refs += [(fig, style, lines) for style, lines in data_lines
+                                    if lines[0] is not None]
+
+                # ----------------------------------------------
+                # get error bar list for editing later, the components of the
+                # legends are xx, xy, yx, yy and, with a tipper, tx, ty
+                components = [erxx, erxy, eryx, eryy]
+                if self.plot_tipper:
+                    components += [ertx, erty]
+                try:
+                    line_list = [[er[0]] for er in components]
+                    self._err_list = [[er[1][0], er[1][1], er[2][0]] for er in components]
+                except IndexError:
+                    self._logger.warning('Found no Z components for %s', station)
+                    line_list = [[None] for er in components]
+                    self._err_list = [[None, None, None] for er in components]
+                # ------------------------------------------
+                # make things look nice
+                # set titles of the Z components
+                label_list = [['$Z_{xx}$'], ['$Z_{xy}$'],
+                              ['$Z_{yx}$'], ['$Z_{yy}$']]
+                for ax, label in zip(self.ax_list[0:4], label_list):
+                    ax.set_title(label[0], fontdict=fontdict)
+
+                    # set legends for tipper components
+                # fake a line
+                l1 = plt.Line2D([0], [0], linewidth=0, color='w', linestyle='None',
+                                marker='.')
+                t_label_list = ['Re{$T_x$}', 'Im{$T_x$}', 'Re{$T_y$}', 'Im{$T_y$}']
+                label_list += [['$T_{x}$'], ['$T_{y}$']]
+                for ax, label in zip(self.ax_list[-4:], t_label_list):
+                    ax.legend([l1], [label], **tipper_legend_kwargs)
+
+
+
+                # period scale and limits, set once for each group of axes
+                # sharing the x-axis, axpxx is the only axes not sharing axrxx
+                x_limits = (10 ** (np.floor(np.log10(period[0]))) * 1.01,
+                            10 ** (np.ceil(np.log10(period[-1]))) * .99)
+                for ax in (axrxx, axpxx):
+                    ax.set_xscale('log', nonposx='clip')
+                    ax.set_xlim(x_limits)
 
-            # convert to apparent resistivity and phase
-            z_obj.compute_resistivity_phase()
+                # set axis properties
+                for aa, ax in enumerate(self.ax_list):
+                    ax.tick_params(axis='both', which='both', labelsize=self.font_size)
+                    ax.tick_params(axis='y', pad=self.ylabel_pad)
+
+                    if aa < 8:
+                        #                    ylabels[-1] = ''
+                        #                    ylabels[0] = ''
+                        #                    ax.set_yticklabels(ylabels)
+                        #                    plt.setp(ax.get_xticklabels(), visible=False)
+                        if self.plot_z == True and not self.log10_z:
+                            ax.set_yscale('log', nonposy='clip')
 
-            # find locations where points have been masked
-            nzxx = np.nonzero(z_obj.z[:, 0, 0])[0]
-            nzxy = np.nonzero(z_obj.z[:, 0, 1])[0]
-            nzyx = np.nonzero(z_obj.z[:, 1, 0])[0]
-            nzyy = np.nonzero(z_obj.z[:, 1, 1])[0]
-            ntx = np.nonzero(t_obj.tipper[:, 0, 0])[0]
-            nty = np.nonzero(t_obj.tipper[:, 0, 1])[0]
+                    else:
+                        ax.set_xlabel('Period (s)', fontdict=fontdict)
 
-            # convert to apparent resistivity and phase
-            if self.plot_z:
-                scaling = np.zeros_like(z_obj.z)
-                for ii in range(2):
-                    for jj in range(2):
-                        scaling[:, ii, jj] = 1. / np.sqrt(z_obj.freq)
-                plot_res = abs(z_obj.z.real * scaling)
-                plot_res_err = abs(z_obj.z_err * scaling)
-                plot_phase = abs(z_obj.z.imag * scaling)
-                plot_phase_err = abs(z_obj.z_err * scaling)
-                h_ratio = [1, 1, .5]
-
-            elif not self.plot_z:
-                plot_res = z_obj.resistivity
-                plot_res_err = z_obj.resistivity_err
-                plot_phase = z_obj.phase
-                plot_phase_err = z_obj.phase_err
-                h_ratio = [1.5, 1, .5]
+                    if aa < 4 and self.plot_z is False:
+                        ax.set_yscale('log', nonposy='clip')
+                        if aa == 0 or aa == 3:
+                            ax.set_ylim(self.res_limits_d)
+                        elif aa == 1 or aa == 2:
+                            ax.set_ylim(self.res_limits_od)
+
+                    if aa > 3 and aa < 8 and self.plot_z is False:
+                        ax.yaxis.set_major_formatter(MultipleLocator(10))
+                        if self.phase_limits_d is not None:
+                            ax.set_ylim(self.phase_limits_d)
+                    # set axes labels
+                    if aa == 0:
+                        if self.plot_z == False:
+                            ax.set_ylabel('App. Res. ($\mathbf{\Omega \cdot m}$)',
+                                          fontdict=fontdict)
+                        elif self.plot_z == True:
+                            ax.set_ylabel('Re[Z (mV/km nT)]',
+                                          fontdict=fontdict)
+                    elif aa == 4:
+                        if self.plot_z == False:
+                            ax.set_ylabel('Phase (deg)',
+                                          fontdict=fontdict)
+                        elif self.plot_z == True:
+                            ax.set_ylabel('Im[Z (mV/km nT)]',
+                                          fontdict=fontdict)
+                    elif aa == 8:
+                        ax.set_ylabel('Tipper',
+                                      fontdict=fontdict)
 
-                try:
-                    self.res_limits_d = (10 ** (np.floor(np.log10(min([plot_res[nzxx, 0, 0].min(),
-                                                                       plot_res[nzyy, 1, 1].min()])))),
-                                         10 ** (np.ceil(np.log10(max([plot_res[nzxx, 0, 0].max(),
-                                                                      plot_res[nzyy, 1, 1].max()])))))
-                except ValueError:
-                    self.res_limits_d = None
-                try:
-                    self.res_limits_od = (10 ** (np.floor(np.log10(min([plot_res[nzxy, 0, 1].min(),
-                                                                        plot_res[nzyx, 1, 0].min()])))),
-                                          10 ** (np.ceil(np.log10(max([plot_res[nzxy, 0, 1].max(),
-                                                                       plot_res[nzyx, 1, 0].max()])))))
-                except ValueError:
-                    self.res_limits_od = None
-
-            # make figure
+                    if aa > 7:
+                        ax.yaxis.set_major_locator(MultipleLocator(.1))
+                        if self.tipper_limits is not None:
+                            ax.set_ylim(self.tipper_limits)
+                        else:
+                            pass
+
+                    ax.grid(True, alpha=.25)
+
+                    if aa < 8:
+                        # the labels follow the ticks when the limits change
+                        if self.plot_z and self.log10_z:
+                            # ticks at the decades of the log10 values
+                            ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+                            ax.yaxis.set_major_formatter(_InnerTickFormatter(log10=True))
+                        else:
+                            ax.yaxis.set_major_formatter(_InnerTickFormatter())
+                        plt.setp(ax.get_xticklabels(), visible=False)
+
+
+                        ##----------------------------------------------
+                # plot model response
+                if self.resp_object is not None:
+                    for resp_obj in self.resp_object:
+                        resp_z_obj = resp_obj.mt_dict[station].Z
+                        resp_z_err = _normalized_residual(z_obj.z, resp_z_obj.z, z_obj.z_err)
+                        self._compute_resistivity_phase(resp_z_obj)
+
+                        resp_t_obj = resp_obj.mt_dict[station].Tipper
+                        resp_t_err = _normalized_residual(t_obj.tipper, resp_t_obj.tipper, t_obj.tipper_err)
+
+                        # convert to apparent resistivity and phase
+                        if self.plot_z == True:
+                            z_buffers = self._impedance_buffers('response', resp_z_obj.z.shape)
+                            r_plot_res, _, r_plot_phase, _ = _scaled_impedance(resp_z_obj.z,
+                                                                               resp_z_obj.freq,
+                                                                               out=z_buffers)
+                            if self.log10_z:
+                                with np.errstate(divide='ignore'):
+                                    r_plot_res = np.log10(r_plot_res)
+                                    r_plot_phase = np.log10(r_plot_phase)
+
+                        elif self.plot_z == False:
+                            r_plot_res = resp_z_obj.resistivity
+                            r_plot_phase = resp_z_obj.phase
+
+                        # plot data response
+                        rerxx = _plot_line(axrxx,
+                                           pxx,
+                                           r_plot_res[nzxx, 0, 0],
+                                           **kw_model_xx)
+                        rerxy = _plot_line(axrxy,
+                                           pxy,
+                                           r_plot_res[nzxy, 0, 1],
+                                           **kw_model_xx)
+                        reryx = _plot_line(axryx,
+                                           pyx,
+                                           r_plot_res[nzyx, 1, 0],
+                                           **kw_model_yy)
+                        reryy = _plot_line(axryy,
+                                           pyy,
+                                           r_plot_res[nzyy, 1, 1],
+                                           **kw_model_yy)
+                        # plot phase
+                        repxx = _plot_line(axpxx,
+                                           pxx,
+                                           r_plot_phase[nzxx, 0, 0],
+                                           **kw_model_xx)
+                        repxy = _plot_line(axpxy,
+                                           pxy,
+                                           r_plot_phase[nzxy, 0, 1],
+                                           **kw_model_xx)
+                        repyx = _plot_line(axpyx,
+                                           pyx,
+                                           r_plot_phase[nzyx, 1, 0],
+                                           **kw_model_yy)
+                        repyy = _plot_line(axpyy,
+                                           pyy,
+                                           r_plot_phase[nzyy, 1, 1],
+                                           **kw_model_yy)
+
+                        # plot tipper
+                        if self.plot_tipper:
+                            rertx = _plot_line(axtxr,
+                                               ptx,
+                                               resp_t_obj.tipper[ntx, 0, 0].real,
+                                               **kw_model_xx)
+                            rerty = _plot_line(axtyr,
+                                               pty,
+                                               resp_t_obj.tipper[nty, 0, 1].real,
+                                               **kw_model_yy)
+
+                            reptx = _plot_line(axtxi,
+                                               ptx,
+                                               resp_t_obj.tipper[ntx, 0, 0].imag,
+                                               **kw_model_xx)
+                            repty = _plot_line(axtyi,
+                                               pty,
+                                               resp_t_obj.tipper[nty, 0, 1].imag,
+                                               **kw_model_yy)
+
+                        model_lines = [('model_xx', rerxx), ('model_xx', rerxy),
+                                       ('model_yy', reryx), ('model_yy', reryy),
+                                       ('model_xx', repxx), ('model_xx', repxy),
+                                       ('model_yy', repyx), ('model_yy', repyy)]
+                        if self.plot_tipper:
+                            model_lines += [('model_xx', rertx), ('model_yy', rerty),
+                                            ('model_xx', reptx), ('model_yy', repty)]
+                        self._line_refs += [(fig, style, lines) for style, lines in model_lines
+                                            if lines[0] is not None]
+
+                        if self.plot_tipper:
+                            rms = _residual_rms(resp_z_err, resp_t_err)
+                        else:
+                            rms = _residual_rms(resp_z_err)
+                        labels = _response_labels(rms)
+
+                        model_components = [rerxx, rerxy, reryx, reryy]
+                        if self.plot_tipper:
+                            model_components += [rertx, rerty]
+                        for aa, (er, label) in enumerate(zip(model_components, labels)):
+                            line_list[aa] += [er[0]]
+                            label_list[aa] += [label]
+
+                    legend_ax_list = self.ax_list[0:4]
+                    #                if self.plot_tipper == True:
+                    #                    legend_ax_list += [self.ax_list[-4], self.ax_list[-2]]
+
+                    for aa, ax in enumerate(legend_ax_list):
+                        # leave out the components without points
+                        entries = [(line, label) for line, label in
+                                   zip(line_list[aa], label_list[aa]) if line is not None]
+                        if entries:
+                            handles, labels = zip(*entries)
+                            ax.legend(handles, labels, **legend_kwargs)
+                            self._legend_refs.append((fig, ax, handles, labels, legend_kwargs))
+
+                if save_dir is not None:
+                    writes.append(self._save_station_figure(fig, station, save_dir,
+                                                            file_format, writer))
+
+                if self.backend is None:
+                    plt.show()
+        finally:
+            if writer is not None:
+                writer.close()
+                writer.join()
+
+        if writer is not None:
+            # raise the errors of the writes
+            for result in writes:
+                result.get()
+
+        self._layout_state = self._get_layout_state()
+
+    def _new_figure(self, station):
+        """
+        get an empty figure for a station, from pyplot or, for the agg
+        backend, a figure with its own Agg canvas unknown to pyplot.
+        """
+        if self.backend is None:
             fig = plt.figure(station, self.fig_size, dpi=self.fig_dpi)
-            plt.clf()
-            fig.suptitle(str(station), fontdict=fontdict)
+            fig.clf()
+        else:
+            fig = Figure(self.fig_size, dpi=self.fig_dpi)
+            FigureCanvasAgg(fig)
+        self.fig = fig
+        self.fig_list.append(fig)
+        return fig
+
+    def _save_station_figure(self, fig, station, save_dir, file_format,
+                             writer=None):
+        """
+        save the figure of a station to save_dir/station.file_format
 
-            # set the grid of subplots
-            if np.all(t_obj.tipper == 0.0) == True:
-                self.plot_tipper = False
+        with a writer thread pool, the figure is rendered to memory and the
+        AsyncResult of writing it to disk is returned, so the figure can be
+        reused right away.  All the matplotlib calls stay in this thread.
+        """
+        save_fn = os.path.join(save_dir, '{0}.{1}'.format(station, file_format))
+        self.fig_fn = save_fn
+        if writer is None:
+            fig.savefig(save_fn, dpi=_savefig_dpi(fig, self.fig_dpi), format=file_format)
+            return None
+        buf = io.BytesIO()
+        fig.savefig(buf, dpi=_savefig_dpi(fig, self.fig_dpi), format=file_format)
+        return writer.apply_async(_write_file, (save_fn, buf.getvalue()))
+
+    def _plot_station_batched(self, fig, station, period, h_ratio, z_masks,
+                              t_masks, plot_res, plot_res_err, plot_phase,
+                              plot_phase_err, t_obj):
+        """
+        plot the data and responses of a station in 3 axes, resistivity,
+        phase and tipper.  The 4 components of each axes are side by side,
+        translated along the log10(period) axis, the lines of each data set
+        are drawn as one LineCollection, the markers as one scatter for each
+        marker and the error bars as one vlines call.
+
+        Differences with the plot of each component in its own axes:
+            * the components of an axes share its y limits, with plot_z
+              False the resistivity limits span res_limits_d and
+              res_limits_od
+            * the error bars have no caps
+            * there are no legends, so the rms of the responses are not
+              shown
+        """
+        log_period = np.log10(period)
+        x_min = np.floor(log_period.min())
+        n_decades = max(int(np.ceil(log_period.max()) - x_min), 1)
+        # width of a component with the gap to the next component
+        step = 1.25 * n_decades
+
+        gs = gridspec.GridSpec(3, 1,
+                               left=self.subplot_left,
+                               top=self.subplot_top,
+                               bottom=self.subplot_bottom,
+                               right=self.subplot_right,
+                               hspace=self.subplot_hspace,
+                               height_ratios=h_ratio)
+        axr = fig.add_subplot(gs[0])
+        axp = fig.add_subplot(gs[1], sharex=axr)
+        axt = fig.add_subplot(gs[2], sharex=axr)
+        self.ax_list = [axr, axp, axt]
+
+        def draw(ax, masks, values, errors, colors, markers, ms, lw):
+            # translate each component to its own band
+            x_list = [log_period[mask] - x_min + kk * step
+                      for kk, mask in enumerate(masks)]
+            if not any(xx.size for xx in x_list):
+                return
+            ax.add_collection(LineCollection(
+                [np.column_stack((xx, yy)) for xx, yy in zip(x_list, values)
+                 if xx.size > 0],
+                colors=[cc for xx, cc in zip(x_list, colors) if xx.size > 0],
+                linewidths=lw, linestyles='dotted'))
+            xs = np.concatenate(x_list)
+            ys = np.concatenate(values)
+            sizes = [xx.size for xx in x_list]
+            point_colors = np.repeat([colorConverter.to_rgba(cc) for cc in colors],
+                                     sizes, axis=0)
+            if errors is not None:
+                es = np.concatenate(errors)
+                ax.vlines(xs, ys - es, ys + es, colors=point_colors,
+                          linewidths=self.e_capthick)
+            # a scatter can only draw one marker
+            point_markers = np.repeat(np.array(markers, dtype=object), sizes)
+            for marker in set(markers):
+                is_marker = point_markers == marker
+                if is_marker.any():
+                    ax.scatter(xs[is_marker], ys[is_marker], s=ms ** 2,
+                               c=point_colors[is_marker], marker=marker, zorder=3)
+
+        z_index = [(0, 0), (0, 1), (1, 0), (1, 1)]
+        t_masks = [t_masks[0], t_masks[0], t_masks[1], t_masks[1]]
+
+        data_colors = [self.cted, self.cted, self.ctmd, self.ctmd]
+        data_markers = [self.mted, self.mted, self.mtmd, self.mtmd]
+        draw(axr, z_masks,
+             [plot_res[mask, ii, jj] for mask, (ii, jj) in zip(z_masks, z_index)],
+             [plot_res_err[mask, ii, jj] for mask, (ii, jj) in zip(z_masks, z_index)],
+             data_colors, data_markers, self.ms, self.lw)
+        draw(axp, z_masks,
+             [plot_phase[mask, ii, jj] for mask, (ii, jj) in zip(z_masks, z_index)],
+             [plot_phase_err[mask, ii, jj] for mask, (ii, jj) in zip(z_masks, z_index)],
+             data_colors, data_markers, self.ms, self.lw)
+        if self.plot_tipper:
+            tipper = [t_obj.tipper[t_masks[0], 0, 0].real,
+                      t_obj.tipper[t_masks[1], 0, 0].imag,
+                      t_obj.tipper[t_masks[2], 0, 1].real,
+                      t_obj.tipper[t_masks[3], 0, 1].imag]
+            draw(axt, t_masks, tipper,
+                 [t_obj.tipper_err[t_masks[0], 0, 0],
+                  t_obj.tipper_err[t_masks[1], 0, 0],
+                  t_obj.tipper_err[t_masks[2], 0, 1],
+                  t_obj.tipper_err[t_masks[3], 0, 1]],
+                 data_colors, data_markers, self.ms, self.lw)
+
+        resp_colors = [self.ctem, self.ctem, self.ctmm, self.ctmm]
+        resp_markers = [self.mtem, self.mtem, self.mtmm, self.mtmm]
+        for resp_obj in self.resp_object:
+            resp_z_obj = resp_obj.mt_dict[station].Z
+            if self.plot_z:
+                z_buffers = self._impedance_buffers('response', resp_z_obj.z.shape)
+                r_plot_res, _, r_plot_phase, _ = _scaled_impedance(resp_z_obj.z,
+                                                                   resp_z_obj.freq,
+                                                                   out=z_buffers)
             else:
-                self.plot_tipper = True
-                self.tipper_limits = (np.round(min([t_obj.tipper[ntx, 0, 0].real.min(),
-                                                    t_obj.tipper[nty, 0, 1].real.min(),
-                                                    t_obj.tipper[ntx, 0, 0].imag.min(),
-                                                    t_obj.tipper[nty, 0, 1].imag.min()]),
-                                               1),
-                                      np.round(max([t_obj.tipper[ntx, 0, 0].real.max(),
-                                                    t_obj.tipper[nty, 0, 1].real.max(),
-                                                    t_obj.tipper[ntx, 0, 0].imag.max(),
-                                                    t_obj.tipper[nty, 0, 1].imag.max()]),
-                                               1))
-
-            gs = gridspec.GridSpec(3, 4,
-                                   wspace=self.subplot_wspace,
-                                   left=self.subplot_left,
-                                   top=self.subplot_top,
-                                   bottom=self.subplot_bottom,
-                                   right=self.subplot_right,
-                                   hspace=self.subplot_hspace,
-                                   height_ratios=h_ratio)
-
-            axrxx = fig.add_subplot(gs[0, 0])
-            axrxy = fig.add_subplot(gs[0, 1], sharex=axrxx)
-            axryx = fig.add_subplot(gs[0, 2], sharex=axrxx, sharey=axrxy)
-            axryy = fig.add_subplot(gs[0, 3], sharex=axrxx, sharey=axrxx)
-
-            axpxx = fig.add_subplot(gs[1, 0])
-            axpxy = fig.add_subplot(gs[1, 1], sharex=axrxx)
-            axpyx = fig.add_subplot(gs[1, 2], sharex=axrxx)
-            axpyy = fig.add_subplot(gs[1, 3], sharex=axrxx)
-
-            axtxr = fig.add_subplot(gs[2, 0], sharex=axrxx)
-            axtxi = fig.add_subplot(gs[2, 1], sharex=axrxx, sharey=axtxr)
-            axtyr = fig.add_subplot(gs[2, 2], sharex=axrxx)
-            axtyi = fig.add_subplot(gs[2, 3], sharex=axrxx, sharey=axtyr)
-
-            self.ax_list = [axrxx, axrxy, axryx, axryy,
-                            axpxx, axpxy, axpyx, axpyy,
-                            axtxr, axtxi, axtyr, axtyi]
-
-            # ---------plot the apparent resistivity-----------------------------------
-            # plot each component in its own subplot
-            # plot data response
-            erxx = mtplottools.plot_errorbar(axrxx,
-                                             period[nzxx],
-                                             plot_res[nzxx, 0, 0],
-                                             plot_res_err[nzxx, 0, 0],
-                                             **kw_xx)
-            erxy = mtplottools.plot_errorbar(axrxy,
-                                             period[nzxy],
-                                             plot_res[nzxy, 0, 1],
-                                             plot_res_err[nzxy, 0, 1],
-                                             **kw_xx)
-            eryx = mtplottools.plot_errorbar(axryx,
-                                             period[nzyx],
-                                             plot_res[nzyx, 1, 0],
-                                             plot_res_err[nzyx, 1, 0],
-                                             **kw_yy)
-            eryy = mtplottools.plot_errorbar(axryy,
-                                             period[nzyy],
-                                             plot_res[nzyy, 1, 1],
-                                             plot_res_err[nzyy, 1, 1],
-                                             **kw_yy)
-            # plot phase
-            epxx = mtplottools.plot_errorbar(axpxx,
-                                             period[nzxx],
-                                             plot_phase[nzxx, 0, 0],
-                                             plot_phase_err[nzxx, 0, 0],
-                                             **kw_xx)
-            epxy = mtplottools.plot_errorbar(axpxy,
-                                             period[nzxy],
-                                             plot_phase[nzxy, 0, 1],
-                                             plot_phase_err[nzxy, 0, 1],
-                                             **kw_xx)
-            epyx = mtplottools.plot_errorbar(axpyx,
-                                             period[nzyx],
-                                             plot_phase[nzyx, 1, 0],
-                                             plot_phase_err[nzyx, 1, 0],
-                                             **kw_yy)
-            epyy = mtplottools.plot_errorbar(axpyy,
-                                             period[nzyy],
-                                             plot_phase[nzyy, 1, 1],
-                                             plot_phase_err[nzyy, 1, 1],
-                                             **kw_yy)
-
-            # plot tipper
+                self._compute_resistivity_phase(resp_z_obj)
+                r_plot_res = resp_z_obj.resistivity
+                r_plot_phase = resp_z_obj.phase
+            draw(axr, z_masks,
+                 [r_plot_res[mask, ii, jj] for mask, (ii, jj) in zip(z_masks, z_index)],
+                 None, resp_colors, resp_markers, self.ms_r, self.lw_r)
+            draw(axp, z_masks,
+                 [r_plot_phase[mask, ii, jj] for mask, (ii, jj) in zip(z_masks, z_index)],
+                 None, resp_colors, resp_markers, self.ms_r, self.lw_r)
             if self.plot_tipper:
-                ertx = mtplottools.plot_errorbar(axtxr,
-                                                 period[ntx],
-                                                 t_obj.tipper[ntx, 0, 0].real,
-                                                 t_obj.tipper_err[ntx, 0, 0],
-                                                 **kw_xx)
-                erty = mtplottools.plot_errorbar(axtyr,
-                                                 period[nty],
-                                                 t_obj.tipper[nty, 0, 1].real,
-                                                 t_obj.tipper_err[nty, 0, 1],
-                                                 **kw_yy)
-
-                eptx = mtplottools.plot_errorbar(axtxi,
-                                                 period[ntx],
-                                                 t_obj.tipper[ntx, 0, 0].imag,
-                                                 t_obj.tipper_err[ntx, 0, 0],
-                                                 **kw_xx)
-                epty = mtplottools.plot_errorbar(axtyi,
-                                                 period[nty],
-                                                 t_obj.tipper[nty, 0, 1].imag,
-                                                 t_obj.tipper_err[nty, 0, 1],
-                                                 **kw_yy)
-
-            # ----------------------------------------------
-            # get error bar list for editing later
-            if not self.plot_tipper:
-                try:
-                    self._err_list = [[erxx[1][0], erxx[1][1], erxx[2][0]],
-                                      [erxy[1][0], erxy[1][1], erxy[2][0]],
-                                      [eryx[1][0], eryx[1][1], eryx[2][0]],
-                                      [eryy[1][0], eryy[1][1], eryy[2][0]]]
-                    line_list = [[erxx[0]], [erxy[0]], [eryx[0]], [eryy[0]]]
-                except IndexError:
-                    print 'Found no Z components for {0}'.format(self.station)
-                    line_list = [[None], [None],
-                                 [None], [None]]
-
-                    self._err_list = [[None, None, None],
-                                      [None, None, None],
-                                      [None, None, None],
-                                      [None, None, None]]
+                resp_tipper = resp_obj.mt_dict[station].Tipper.tipper
+                draw(axt, t_masks,
+                     [resp_tipper[t_masks[0], 0, 0].real,
+                      resp_tipper[t_masks[1], 0, 0].imag,
+                      resp_tipper[t_masks[2], 0, 1].real,
+                      resp_tipper[t_masks[3], 0, 1].imag],
+                     None, resp_colors, resp_markers, self.ms_r, self.lw_r)
+
+        # ------------------------------------------
+        # make things look nice
+        fontdict = {'size': self.font_size + 2, 'weight': 'bold'}
+        for ax in self.ax_list:
+            ax.autoscale_view()
+            ax.grid(True, alpha=.25)
+            ax.tick_params(axis='both', which='both', labelsize=self.font_size)
+            ax.tick_params(axis='y', pad=self.ylabel_pad)
+        axr.set_yscale('log', nonposy='clip')
+        if self.plot_z:
+            axp.set_yscale('log', nonposy='clip')
+            axr.set_ylabel('Re[Z (mV/km nT)]', fontdict=fontdict)
+            axp.set_ylabel('Im[Z (mV/km nT)]', fontdict=fontdict)
+        else:
+            axr.set_ylabel('App. Res. ($\mathbf{\Omega \cdot m}$)',
+                           fontdict=fontdict)
+            axp.set_ylabel('Phase (deg)', fontdict=fontdict)
+            res_limits = [limits for limits in (self.res_limits_d, self.res_limits_od)
+                          if limits is not None]
+            if res_limits:
+                axr.set_ylim(min(limits[0] for limits in res_limits),
+                             max(limits[1] for limits in res_limits))
+            if self.phase_limits_d is not None:
+                axp.set_ylim(self.phase_limits_d)
+        axt.set_ylabel('Tipper', fontdict=fontdict)
+        if self.plot_tipper and self.tipper_limits is not None:
+            axt.set_ylim(self.tipper_limits)
+        axt.set_xlabel('Period (s)', fontdict=fontdict)
+        plt.setp(axr.get_xticklabels() + axp.get_xticklabels(), visible=False)
+
+        # a decade tick for each component, labeled with the period
+        axr.set_xlim(-.1 * step, 3 * step + 1.1 * n_decades)
+        axt.set_xticks([kk * step + dd for kk in range(4)
+                        for dd in range(n_decades + 1)])
+        axt.set_xticklabels(['$10^{%d}$' % (x_min + dd) for kk in range(4)
+                             for dd in range(n_decades + 1)])
+
+        # name the components over their band
+        for kk, (z_label, t_label) in enumerate(zip(
+                ['$Z_{xx}$', '$Z_{xy}$', '$Z_{yx}$', '$Z_{yy}$'],
+                ['Re{$T_x$}', 'Im{$T_x$}', 'Re{$T_y$}', 'Im{$T_y$}'])):
+            center = kk * step + .5 * n_decades
+            axr.text(center, 1.02, z_label, ha='center', va='bottom',
+                     transform=axr.get_xaxis_transform(), fontdict=fontdict)
+            axt.text(center, .95, t_label, ha='center', va='top',
+                     transform=axt.get_xaxis_transform(),
+                     fontdict={'size': max([self.font_size, 6])})
+
+    def _impedance_buffers(self, role, shape):
+        """
+        get the pair of arrays _scaled_impedance() computes the impedance of
+        the data or of the responses in, allocated once for each shape.  The
+        plotted values are masked copies, so the arrays can be overwritten by
+        the next station.
+        """
+        key = (role, shape)
+        buffers = self._z_buffers.get(key)
+        if buffers is None:
+            buffers = (np.empty(shape), np.empty(shape))
+            self._z_buffers[key] = buffers
+        return buffers
+
+    def _station_masks(self, station, z_obj, t_obj, period):
+        """
+        get the masks of the non zero impedance (xx, xy, yx, yy) and tipper
+        (x, y) points of a station, and the periods of these points.  They
+        are computed once for the same z, tipper and period arrays.
 
-            else:
-                try:
-                    line_list = [[erxx[0]], [erxy[0]],
-                                 [eryx[0]], [eryy[0]],
-                                 [ertx[0]], [erty[0]]]
-
-                    self._err_list = [[erxx[1][0], erxx[1][1], erxx[2][0]],
-                                      [erxy[1][0], erxy[1][1], erxy[2][0]],
-                                      [eryx[1][0], eryx[1][1], eryx[2][0]],
-                                      [eryy[1][0], eryy[1][1], eryy[2][0]],
-                                      [ertx[1][0], ertx[1][1], ertx[2][0]],
-                                      [erty[1][0], erty[1][1], erty[2][0]]]
-                except IndexError:
-                    print 'Found no Z components for {0}'.format(station)
-                    line_list = [[None], [None],
-                                 [None], [None],
-                                 [None], [None]]
-
-                    self._err_list = [[None, None, None],
-                                      [None, None, None],
-                                      [None, None, None],
-                                      [None, None, None],
-                                      [None, None, None],
-                                      [None, None, None]]
-            # ------------------------------------------
-            # make things look nice
-            # set titles of the Z components
-            label_list = [['$Z_{xx}$'], ['$Z_{xy}$'],
-                          ['$Z_{yx}$'], ['$Z_{yy}$']]
-            for ax, label in zip(self.ax_list[0:4], label_list):
-                ax.set_title(label[0], fontdict={'size': self.font_size + 2,
-                                                 'weight': 'bold'})
-
-                # set legends for tipper components
-            # fake a line
-            l1 = plt.Line2D([0], [0], linewidth=0, color='w', linestyle='None',
-                            marker='.')
-            t_label_list = ['Re{$T_x$}', 'Im{$T_x$}', 'Re{$T_y$}', 'Im{$T_y$}']
-            label_list += [['$T_{x}$'], ['$T_{y}$']]
-            for ax, label in zip(self.ax_list[-4:], t_label_list):
-                ax.legend([l1], [label], loc='upper left',
-                          markerscale=.01,
-                          borderaxespad=.05,
-                          labelspacing=.01,
-                          handletextpad=.05,
-                          borderpad=.05,
-                          prop={'size': max([self.font_size, 6])})
+        Changing the values of z or tipper in place is not detected, use
+        redraw_plot(force=True) in that case.
+        """
+        arrays = (z_obj.z, t_obj.tipper, period)
+        cached = self._mask_cache.get(station)
+        if cached is not None and \
+                all(a is b for a, b in zip(cached[0], arrays)):
+            return cached[1], cached[2]
+
+        masks = tuple(z_obj.z[:, ii, jj] != 0
+                      for ii, jj in ((0, 0), (0, 1), (1, 0), (1, 1)))
+        masks += (t_obj.tipper[:, 0, 0] != 0, t_obj.tipper[:, 0, 1] != 0)
+        periods = tuple(period[mask] for mask in masks)
+        self._mask_cache[station] = (arrays, masks, periods)
+        return masks, periods
+
+    def _plot_component(self, ax, period, mask, values, errors, index, kw):
+        """
+        plot the points of a component of the data with error bars
+
+        :param period: periods of the points of the component
+        :param mask: mask of the points of the component in the first axis
+                     of values and errors
+        :param index: (ii, jj) index of the component in the last 2 axes
+        :param kw: keyword arguments of mtplottools.plot_errorbar
+        :return: the errorbar container, or _NO_ERRORBAR when the mask
+                 selects no point
+        """
+        if not mask.any():
+            return _NO_ERRORBAR
+        ii, jj = index
+        return mtplottools.plot_errorbar(ax, period, values[mask, ii, jj],
+                                         errors[mask, ii, jj], **kw)
 
+    def _compute_resistivity_phase(self, z_obj):
+        """
+        compute the resistivity and phase of a Z object, unless they were
+        already computed here from the same z, z_err and freq arrays and
+        have not been reset since.
 
+        Changing the values of z or z_err in place is not detected, use
+        redraw_plot(force=True) in that case.
+        """
+        key = id(z_obj)
+        arrays = (z_obj.z, z_obj.z_err, z_obj.freq)
+        cached = self._rp_cache.pop(key, None)
+        # the cached entry keeps a reference to z_obj, so its id is not reused
+        if cached is None or cached[0] is not z_obj or \
+                cached[2] is not z_obj.resistivity or \
+                any(a is not b for a, b in zip(cached[1], arrays)):
+            z_obj.compute_resistivity_phase()
+            cached = (z_obj, arrays, z_obj.resistivity)
+        self._rp_cache[key] = cached  # (re)insert as the most recently used
+        if len(self._rp_cache) > self._rp_cache_size:
+            self._rp_cache.popitem(last=False)
 
-                # set axis properties
-            for aa, ax in enumerate(self.ax_list):
-                ax.tick_params(axis='y', pad=self.ylabel_pad)
-
-                if aa < 8:
-                    #                    ylabels[-1] = ''
-                    #                    ylabels[0] = ''
-                    #                    ax.set_yticklabels(ylabels)
-                    #                    plt.setp(ax.get_xticklabels(), visible=False)
-                    if self.plot_z == True:
-                        ax.set_yscale('log', nonposy='clip')
+    def _restyle_lines(self):
+        """
+        apply the current colors, markers, marker sizes and line widths to the
+        plotted lines and error bars
+        """
+        styles = {'xx': (self.cted, self.mted, self.ms, self.lw),
+                  'yy': (self.ctmd, self.mtmd, self.ms, self.lw),
+                  'model_xx': (self.ctem, self.mtem, self.ms_r, self.lw_r),
+                  'model_yy': (self.ctmm, self.mtmm, self.ms_r, self.lw_r)}
+        for fig, style, lines in self._line_refs:
+            color, marker, ms, lw = styles[style]
+            line = lines[0]
+            line.set_color(color)
+            line.set_marker(marker)
+            line.set_markersize(ms)
+            line.set_markeredgecolor(color)
+            line.set_markeredgewidth(lw)
+            line.set_linewidth(lw)
+            if len(lines) > 1:
+                # error bar container of (line, caplines, barlinecols)
+                for cap in lines[1]:
+                    cap.set_color(color)
+                    cap.set_markeredgecolor(color)
+                for bars in lines[2]:
+                    bars.set_color(color)
+                    bars.set_linewidth(lw)
+
+        # the legends copy the style of their lines when they are made
+        for fig, ax, handles, labels, kwargs in self._legend_refs:
+            ax.legend(handles, labels, **kwargs)
+
+    def _blit_figure(self, fig):
+        """
+        redraw only the plotted lines and their legends over the cached
+        background of a figure.  The background is drawn once with the lines
+        and legends hidden, and again when the figure is resized.
+        """
+        artists = []
+        for ref_fig, style, lines in self._line_refs:
+            if ref_fig is fig:
+                artists.append(lines[0])
+                if len(lines) > 1:
+                    artists += list(lines[1]) + list(lines[2])
+        artists += [ax.get_legend() for ref_fig, ax, handles, labels, kwargs
+                    in self._legend_refs if ref_fig is fig]
+
+        canvas = fig.canvas
+        size = tuple(fig.bbox.bounds)
+        cached = self._backgrounds.get(fig)
+        if cached is None or cached[0] != size:
+            for artist in artists:
+                artist.set_visible(False)
+            canvas.draw()
+            cached = (size, canvas.copy_from_bbox(fig.bbox))
+            self._backgrounds[fig] = cached
+            for artist in artists:
+                artist.set_visible(True)
+
+        canvas.restore_region(cached[1])
+        for artist in artists:
+            fig.draw_artist(artist)
+        # the legends are outside of the axes
+        canvas.blit(fig.bbox)
+        canvas.flush_events()
+
+    def _get_layout_state(self):
+        """
+        get the values of the layout attributes, compared by redraw_plot() to
+        the values of the last plot()
+        """
+        return tuple(repr(getattr(self, name, None)) for name in _LAYOUT_ATTRIBUTES)
 
-                else:
-                    ax.set_xlabel('Period (s)', fontdict=fontdict)
-
-                if aa < 4 and self.plot_z is False:
-                    ax.set_yscale('log', nonposy='clip')
-                    if aa == 0 or aa == 3:
-                        ax.set_ylim(self.res_limits_d)
-                    elif aa == 1 or aa == 2:
-                        ax.set_ylim(self.res_limits_od)
-
-                if aa > 3 and aa < 8 and self.plot_z is False:
-                    ax.yaxis.set_major_formatter(MultipleLocator(10))
-                    if self.phase_limits_d is not None:
-                        ax.set_ylim(self.phase_limits_d)
-                # set axes labels
-                if aa == 0:
-                    if self.plot_z == False:
-                        ax.set_ylabel('App. Res. ($\mathbf{\Omega \cdot m}$)',
-                                      fontdict=fontdict)
-                    elif self.plot_z == True:
-                        ax.set_ylabel('Re[Z (mV/km nT)]',
-                                      fontdict=fontdict)
-                elif aa == 4:
-                    if self.plot_z == False:
-                        ax.set_ylabel('Phase (deg)',
-                                      fontdict=fontdict)
-                    elif self.plot_z == True:
-                        ax.set_ylabel('Im[Z (mV/km nT)]',
-                                      fontdict=fontdict)
-                elif aa == 8:
-                    ax.set_ylabel('Tipper',
-                                  fontdict=fontdict)
-
-                if aa > 7:
-                    ax.yaxis.set_major_locator(MultipleLocator(.1))
-                    if self.tipper_limits is not None:
-                        ax.set_ylim(self.tipper_limits)
-                    else:
-                        pass
-
-                ax.set_xscale('log', nonposx='clip')
-                ax.set_xlim(xmin=10 ** (np.floor(np.log10(period[0]))) * 1.01,
-                            xmax=10 ** (np.ceil(np.log10(period[-1]))) * .99)
-                ax.grid(True, alpha=.25)
-
-                ylabels = ax.get_yticks().tolist()
-                if aa < 8:
-                    ylabels[-1] = ''
-                    ylabels[0] = ''
-                    ax.set_yticklabels(ylabels)
-                    plt.setp(ax.get_xticklabels(), visible=False)
-
-
-                    ##----------------------------------------------
-            # plot model response
-            if self.resp_object is not None:
-                for resp_obj in self.resp_object:
-                    resp_z_obj = resp_obj.mt_dict[station].Z
-                    resp_z_err = np.nan_to_num((z_obj.z - resp_z_obj.z) / z_obj.z_err)
-                    resp_z_obj.compute_resistivity_phase()
-
-                    resp_t_obj = resp_obj.mt_dict[station].Tipper
-                    resp_t_err = np.nan_to_num((t_obj.tipper - resp_t_obj.tipper) / t_obj.tipper_err)
-
-                    # convert to apparent resistivity and phase
-                    if self.plot_z == True:
-                        scaling = np.zeros_like(resp_z_obj.z)
-                        for ii in range(2):
-                            for jj in range(2):
-                                scaling[:, ii, jj] = 1. / np.sqrt(resp_z_obj.freq)
-                        r_plot_res = abs(resp_z_obj.z.real * scaling)
-                        r_plot_phase = abs(resp_z_obj.z.imag * scaling)
-
-                    elif self.plot_z == False:
-                        r_plot_res = resp_z_obj.resistivity
-                        r_plot_phase = resp_z_obj.phase
-
-                    rms_xx = resp_z_err[:, 0, 0].std()
-                    rms_xy = resp_z_err[:, 0, 1].std()
-                    rms_yx = resp_z_err[:, 1, 0].std()
-                    rms_yy = resp_z_err[:, 1, 1].std()
-
-                    # --> make key word dictionaries for plotting
-                    kw_xx = {'color': self.ctem,
-                             'marker': self.mtem,
-                             'ms': self.ms_r,
-                             'ls': ':',
-                             'lw': self.lw_r,
-                             'e_capsize': self.e_capsize,
-                             'e_capthick': self.e_capthick}
-
-                    kw_yy = {'color': self.ctmm,
-                             'marker': self.mtmm,
-                             'ms': self.ms_r,
-                             'ls': ':',
-                             'lw': self.lw_r,
-                             'e_capsize': self.e_capsize,
-                             'e_capthick': self.e_capthick}
-
-                    # plot data response
-                    rerxx = mtplottools.plot_errorbar(axrxx,
-                                                      period[nzxx],
-                                                      r_plot_res[nzxx, 0, 0],
-                                                      None,
-                                                      **kw_xx)
-                    rerxy = mtplottools.plot_errorbar(axrxy,
-                                                      period[nzxy],
-                                                      r_plot_res[nzxy, 0, 1],
-                                                      None,
-                                                      **kw_xx)
-                    reryx = mtplottools.plot_errorbar(axryx,
-                                                      period[nzyx],
-                                                      r_plot_res[nzyx, 1, 0],
-                                                      None,
-                                                      **kw_yy)
-                    reryy = mtplottools.plot_errorbar(axryy,
-                                                      period[nzyy],
-                                                      r_plot_res[nzyy, 1, 1],
-                                                      None,
-                                                      **kw_yy)
-                    # plot phase
-                    repxx = mtplottools.plot_errorbar(axpxx,
-                                                      period[nzxx],
-                                                      r_plot_phase[nzxx, 0, 0],
-                                                      None,
-                                                      **kw_xx)
-                    repxy = mtplottools.plot_errorbar(axpxy,
-                                                      period[nzxy],
-                                                      r_plot_phase[nzxy, 0, 1],
-                                                      None,
-                                                      **kw_xx)
-                    repyx = mtplottools.plot_errorbar(axpyx,
-                                                      period[nzyx],
-                                                      r_plot_phase[nzyx, 1, 0],
-                                                      None,
-                                                      **kw_yy)
-                    repyy = mtplottools.plot_errorbar(axpyy,
-                                                      period[nzyy],
-                                                      r_plot_phase[nzyy, 1, 1],
-                                                      None,
-                                                      **kw_yy)
-
-                    # plot tipper
-                    if self.plot_tipper == True:
-                        rertx = mtplottools.plot_errorbar(axtxr,
-                                                          period[ntx],
-                                                          resp_t_obj.tipper[ntx, 0, 0].real,
-                                                          None,
-                                                          **kw_xx)
-                        rerty = mtplottools.plot_errorbar(axtyr,
-                                                          period[nty],
-                                                          resp_t_obj.tipper[nty, 0, 1].real,
-                                                          None,
-                                                          **kw_yy)
-
-                        reptx = mtplottools.plot_errorbar(axtxi,
-                                                          period[ntx],
-                                                          resp_t_obj.tipper[ntx, 0, 0].imag,
-                                                          None,
-                                                          **kw_xx)
-                        repty = mtplottools.plot_errorbar(axtyi,
-                                                          period[nty],
-                                                          resp_t_obj.tipper[nty, 0, 1].imag,
-                                                          None,
-                                                          **kw_yy)
-
-                    if self.plot_tipper == False:
-                        line_list[0] += [rerxx[0]]
-                        line_list[1] += [rerxy[0]]
-                        line_list[2] += [reryx[0]]
-                        line_list[3] += [reryy[0]]
-                        label_list[0] += ['$Z^m_{xx}$ ' +
-                                          'rms={0:.2f}'.format(rms_xx)]
-                        label_list[1] += ['$Z^m_{xy}$ ' +
-                                          'rms={0:.2f}'.format(rms_xy)]
-                        label_list[2] += ['$Z^m_{yx}$ ' +
-                                          'rms={0:.2f}'.format(rms_yx)]
-                        label_list[3] += ['$Z^m_{yy}$ ' +
-                                          'rms={0:.2f}'.format(rms_yy)]
-                    else:
-                        line_list[0] += [rerxx[0]]
-                        line_list[1] += [rerxy[0]]
-                        line_list[2] += [reryx[0]]
-                        line_list[3] += [reryy[0]]
-                        line_list[4] += [rertx[0]]
-                        line_list[5] += [rerty[0]]
-                        label_list[0] += ['$Z^m_{xx}$ ' +
-                                          'rms={0:.2f}'.format(rms_xx)]
-                        label_list[1] += ['$Z^m_{xy}$ ' +
-                                          'rms={0:.2f}'.format(rms_xy)]
-                        label_list[2] += ['$Z^m_{yx}$ ' +
-                                          'rms={0:.2f}'.format(rms_yx)]
-                        label_list[3] += ['$Z^m_{yy}$ ' +
-                                          'rms={0:.2f}'.format(rms_yy)]
-                        label_list[4] += ['$T^m_{x}$ ' +
-                                          'rms={0:.2f}'.format(resp_t_err[:, 0, 0].std())]
-                        label_list[5] += ['$T^m_{y}$' +
-                                          'rms={0:.2f}'.format(resp_t_err[:, 0, 1].std())]
-
-                legend_ax_list = self.ax_list[0:4]
-                #                if self.plot_tipper == True:
-                #                    legend_ax_list += [self.ax_list[-4], self.ax_list[-2]]
-
-                for aa, ax in enumerate(legend_ax_list):
-                    ax.legend(line_list[aa],
-                              label_list[aa],
-                              loc=self.legend_loc,
-                              bbox_to_anchor=self.legend_pos,
-                              markerscale=self.legend_marker_scale,
-                              borderaxespad=self.legend_border_axes_pad,
-                              labelspacing=self.legend_label_spacing,
-                              handletextpad=self.legend_handle_text_pad,
-                              borderpad=self.legend_border_pad,
-                              prop={'size': max([self.font_size, 5])})
-
-            plt.show()
-
-    def redraw_plot(self):
+    def _can_restyle(self):
+        """
+        check if only the style attributes were changed since the last plot(),
+        and the data and response files were not modified
+        """
+        if not self._line_refs or self._layout_state != self._get_layout_state():
+            return False
+        if _load_data(self.data_fn) is not self.data_object:
+            return False
+        if self.resp_fn is not None:
+            resp_fns = self.resp_fn if type(self.resp_fn) is list else [self.resp_fn]
+            if any(_load_data(fn) is not resp_obj
+                   for fn, resp_obj in zip(resp_fns, self.resp_object)):
+                return False
+        return True
+
+    def redraw_plot(self, force=False, blit=False):
         """
         redraw plot if parameters were changed
 
         use this function if you updated some attributes and want to re-plot.
 
+        When only the colors, markers, marker sizes or line widths were
+        changed, they are applied to the plotted lines of the figures, which
+        are redrawn, otherwise the figures are rebuilt.
+
+        :param force: rebuild the figures and recompute the resistivity and
+                      phase of all the stations, use it if the impedances
+                      were changed in place
+        :param blit: redraw the restyled lines over the cached background of
+                     the figures, with the canvases that can copy their
+                     background (the Agg based ones), the other canvases
+                     are redrawn with draw_idle()
+
         :Example: ::
 
             >>> # change the color and marker of the xy components
@@ -739,12 +1342,58 @@ class PlotResponse(object):
             >>> p1.lw = 2
             >>> p1.redraw_plot()
         """
+        if not force and self._can_restyle():
+            self._restyle_lines()
+            if self.backend is None:
+                for fig in self.fig_list:
+                    # canvas.supports_blit is not available in matplotlib 1.5
+                    if blit and hasattr(fig.canvas, 'copy_from_bbox'):
+                        self._blit_figure(fig)
+                    else:
+                        fig.canvas.draw_idle()
+            return
+
+        if force:
+            self._rp_cache.clear()
+            self._mask_cache.clear()
         for fig in self.fig_list:
             plt.close(fig)
+        self.fig_list = []
         self.plot()
 
+    def _get_tight_bbox(self, fig):
+        """
+        get the padded tight bounding box of a figure in inches, computed
+        once for each figure, or 'tight' when its canvas has no renderer to
+        measure the artists with
+        """
+        if self._tight_bbox is not None and self._tight_bbox[0] is fig:
+            return self._tight_bbox[1]
+        if not hasattr(fig.canvas, 'get_renderer'):
+            return 'tight'
+        # lay out the legends and texts, as print_figure does before measuring
+        fig.canvas.draw()
+        renderer = fig.canvas.get_renderer()
+        bbox = fig.get_tightbbox(renderer)
+        # before matplotlib 3.0, get_tightbbox leaves out the legends outside
+        # of the axes and the suptitle, print_figure adds them from the
+        # default extra artists
+        extents = []
+        for artist in fig.get_default_bbox_extra_artists():
+            extent = artist.get_window_extent(renderer)
+            if artist.get_clip_on() and artist.get_clip_box() is not None:
+                extent = Bbox.intersection(extent, artist.get_clip_box())
+            if extent is not None and (extent.width != 0 or extent.height != 0):
+                extents.append(extent)
+        if extents:
+            extra = TransformedBbox(Bbox.union(extents), Affine2D().scale(1.0 / fig.dpi))
+            bbox = Bbox.union([bbox, extra])
+        bbox = bbox.padded(rcParams['savefig.pad_inches'])
+        self._tight_bbox = (fig, bbox)
+        return bbox
+
     def save_figure(self, save_fn, file_format='pdf', orientation='portrait',
-                    fig_dpi=None, close_fig='y'):
+                    fig_dpi=None, close_fig='y', tight=False):
         """
         save_plot will save the figure to save_fn.
 
@@ -778,6 +1427,14 @@ class PlotResponse(object):
                              * 'y' will close the plot after saving.
                              * 'n' will leave plot open
 
+            **tight** : [ True | False ]
+                        crop the saved figure to its artists, including the
+                        legends above the axes and the station title, as
+                        bbox_inches='tight' would.  The bounding box is
+                        computed once for a figure and reused by the next
+                        saves of it, which saves one rendering each time.
+                        *default* is False to save the whole figure
+
         :Example: ::
 
             >>> # to save plot as jpg
@@ -789,38 +1446,49 @@ class PlotResponse(object):
 
         """
 
-        fig = plt.gcf()
+        if self.backend is None:
+            fig = plt.gcf()
+        else:
+            fig = self.fig
         if fig_dpi == None:
             fig_dpi = self.fig_dpi
 
+        kwargs = {'dpi': _savefig_dpi(fig, fig_dpi)}
+        if tight:
+            kwargs['bbox_inches'] = self._get_tight_bbox(fig)
+
         if os.path.isdir(save_fn) == False:
             file_format = save_fn[-3:]
-            fig.savefig(save_fn, dpi=fig_dpi, format=file_format,
-                        orientation=orientation, bbox_inches='tight')
+            fig.savefig(save_fn, format=file_format,
+                        orientation=orientation, **kwargs)
 
         else:
             save_fn = os.path.join(save_fn, '_L2.' +
                                    file_format)
-            fig.savefig(save_fn, dpi=fig_dpi, format=file_format,
-                        orientation=orientation, bbox_inches='tight')
+            fig.savefig(save_fn, format=file_format,
+                        orientation=orientation, **kwargs)
 
         if close_fig == 'y':
-            plt.clf()
+            fig.clf()
             plt.close(fig)
 
         else:
             pass
 
         self.fig_fn = save_fn
-        print 'Saved figure to: ' + self.fig_fn
+        self._logger.info('Saved figure to: %s', self.fig_fn)
 
-    def update_plot(self):
+    def update_plot(self, force=False):
         """
         update any parameters that where changed using the built-in draw from
         canvas.
 
         Use this if you change an of the .fig or axes properties
 
+        :param force: draw the figures right away, by default the draws are
+                      requested with draw_idle, so several updates in a row
+                      are drawn once by interactive backends
+
         :Example: ::
 
             >>> # to change the grid lines to only be on the major ticks
@@ -833,7 +1501,11 @@ class PlotResponse(object):
 
         """
 
-        self.fig.canvas.draw()
+        for fig in self.fig_list:
+            if force:
+                fig.canvas.draw()
+            else:
+                fig.canvas.draw_idle()
 
     def __str__(self):
         """
@@ -1,6 +1,7 @@
 import functools
 import inspect
 import os
+import warnings
 from mtpy.utils.mtpylog import MtPyLog
 
 
@@ -23,10 +24,8 @@ class deprecated(object):
 
     def __call__(self, cls_or_func):  # pragma: no cover
         if inspect.isfunction(cls_or_func):
-            if hasattr(cls_or_func, 'func_code'):
-                _code = cls_or_func.func_code
-            else:
-                _code = cls_or_func.__code__
+            # __code__ is available on python 2.6+ as well as python 3
+            _code = cls_or_func.__code__
             fmt = "Call to deprecated function or method {name} ({reason})."
             filename = _code.co_filename
             lineno = _code.co_firstlineno + 1
@@ -40,13 +39,20 @@ class deprecated(object):
             raise TypeError(type(cls_or_func))
 
         msg = fmt.format(name=cls_or_func.__name__, reason=self.reason)
+        # the warnings already shown for this function or class, maintained by the warnings module so that the
+        # warning filters of the caller decide how often it is shown, and the filters it was filled under.
+        # Python 2 keeps the entry of an ignored warning as well, so the registry is cleared when the filters change,
+        # or are replaced as warnings.catch_warnings() does, the same as Python 3 does
+        registry = {}
+        registry_filters = [None, None]  # the filters list and a copy of it
 
         @functools.wraps(cls_or_func)
         def new_func(*args, **kwargs):  # pragma: no cover
-            import warnings
-            warnings.simplefilter('always', DeprecationWarning)  # turn off filter
-            warnings.warn_explicit(msg, category=DeprecationWarning, filename=filename, lineno=lineno)
-            warnings.simplefilter('default', DeprecationWarning)  # reset filter
+            if warnings.filters is not registry_filters[0] or warnings.filters != registry_filters[1]:
+                registry.clear()
+                registry_filters[:] = warnings.filters, list(warnings.filters)
+            warnings.warn_explicit(msg, category=DeprecationWarning, filename=filename, lineno=lineno,
+                                   registry=registry)
             return cls_or_func(*args, **kwargs)
 
         return new_func
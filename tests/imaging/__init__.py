@@ -94,19 +94,22 @@ class ImageCompare(object):
 
         test_suite_name = original.__module__.split('.')[-1]
 
+        # resolved once here and not on every call of the test
+        call = original.__func__ if inspect.ismethod(original) else original
+        # the image paths are fixed, their directories are created when the test runs as
+        # the result directory is removed once its images match the baseline
+        pairs = list(self._get_baseline_result_pairs(test_suite_name, filename, self.extensions))
+        image_dirs = sorted(set(os.path.dirname(path) for pair in pairs for path in pair))
+
         @functools.wraps(original)
         def new_test_func(*args, **kwargs):
-            if inspect.ismethod(original):
-                result = original.__func__(*args, **kwargs)
-            else:
-                result = original(*args, **kwargs)
-            for baseline_image, test_image, baseline_rcparams, test_rcparams in self._get_baseline_result_pairs(
-                    test_suite_name,
-                    filename,
-                    self.extensions
-            ):
+            result = call(*args, **kwargs)
+            for image_dir in image_dirs:
+                if not os.path.exists(image_dir):
+                    os.makedirs(image_dir)
+            fig = plt.gcf()
+            for baseline_image, test_image, baseline_rcparams, test_rcparams in pairs:
                 # save image
-                fig = plt.gcf()
                 if fig is not None:
                     if self.fig_size is not None:
                         fig.set_size_inches(self.fig_size)
@@ -177,10 +180,6 @@ class ImageCompare(object):
         else:
             baseline = os.path.join(self.baseline_dir, test_suite_name)
             result = os.path.join(self.result_dir, test_suite_name)
-            if not os.path.exists(baseline):
-                os.makedirs(baseline)
-            if not os.path.exists(result):
-                os.makedirs(result)
 
         for ext in extensions:
             name = '{fname}.{ext}'.format(fname=fname, ext=ext)
@@ -0,0 +1,166 @@
+from unittest import TestCase
+
+import numpy as np
+from scipy.interpolate import griddata
+
+from mtpy.imaging.penetration import build_depth_grid, get_index, get_index_array, get_triangulation, \
+    interpolate_grid, interpolate_idw, _DEPTH_GRID_CACHE, _TRIANGULATION_CACHE
+
+
+class TestInterpolateGrid(TestCase):
+    def setUp(self):
+        self.grid_x, self.grid_y = np.mgrid[0:12:1, 0:10:1]
+        # a 4 x 5 lattice inside the grid, in shuffled order
+        rows, cols = np.meshgrid([1., 4., 6., 10.], [0., 2., 5., 7., 9.], indexing='ij')
+        order = np.random.RandomState(0).permutation(rows.size)
+        self.lattice = np.column_stack((rows.ravel()[order], cols.ravel()[order]))
+        self.scattered = np.random.RandomState(1).uniform(0, 11, (20, 2))
+
+    def _check_griddata(self, points, values, method, **kwargs):
+        expected = griddata(points, values, (self.grid_x, self.grid_y), method=method)
+        actual = interpolate_grid(points, values, self.grid_x, self.grid_y, method=method)
+        self.assertEqual(actual.shape, self.grid_x.shape)
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        valid = ~np.isnan(expected)
+        np.testing.assert_allclose(actual[valid], expected[valid], **kwargs)
+
+    def test_lattice_linear(self):
+        values = np.random.RandomState(2).uniform(100, 1000, len(self.lattice))
+        self._check_griddata(self.lattice, values, 'linear')
+
+    def test_lattice_nearest(self):
+        values = np.random.RandomState(2).uniform(100, 1000, len(self.lattice))
+        # nearest has no nan outside the samples
+        self._check_griddata(self.lattice, values, 'nearest')
+
+    def test_lattice_cubic_linear_data(self):
+        # the separable cubic spline and the Clough-Tocher interpolation agree on linear data
+        values = 3.0 * self.lattice[:, 0] - 2.0 * self.lattice[:, 1] + 50.0
+        self._check_griddata(self.lattice, values, 'cubic', rtol=1e-5)
+
+    def test_scattered(self):
+        values = np.random.RandomState(2).uniform(100, 1000, len(self.scattered))
+        for method in ('nearest', 'linear', 'cubic'):
+            self._check_griddata(self.scattered, values, method, rtol=1e-10)
+
+
+class TestInterpolateIdw(TestCase):
+    def setUp(self):
+        self.points = np.random.RandomState(0).uniform(0, 10, (15, 2))
+        self.values = np.random.RandomState(1).uniform(100, 1000, len(self.points))
+        self.grid_x, self.grid_y = np.mgrid[0:11:1, 0:9:1]
+
+    def test_exact_at_samples(self):
+        grid_z = interpolate_idw(self.points, self.values, self.points[:, 0], self.points[:, 1])
+        np.testing.assert_array_equal(grid_z, self.values)
+
+    def test_sample_on_grid(self):
+        points = np.vstack((self.points, [[3., 4.]]))
+        values = np.append(self.values, 42.0)
+        grid_z = interpolate_idw(points, values, self.grid_x, self.grid_y)
+        self.assertEqual(grid_z.shape, self.grid_x.shape)
+        self.assertEqual(grid_z[3, 4], 42.0)
+
+    def test_blocks(self):
+        expected = interpolate_idw(self.points, self.values, self.grid_x, self.grid_y)
+        for block_size in (1, len(self.points) * 7, len(self.points) * self.grid_x.size - 1):
+            np.testing.assert_allclose(
+                interpolate_idw(self.points, self.values, self.grid_x, self.grid_y, block_size=block_size),
+                expected, rtol=1e-12)
+
+    def test_power(self):
+        for power in (1, 2, 3.5):
+            dist = np.hypot(self.grid_x[..., None] - self.points[:, 0], self.grid_y[..., None] - self.points[:, 1])
+            weights = dist ** -power
+            expected = (weights * self.values).sum(axis=-1) / weights.sum(axis=-1)
+            np.testing.assert_allclose(
+                interpolate_idw(self.points, self.values, self.grid_x, self.grid_y, power=power),
+                expected, rtol=1e-10)
+
+
+class TestGetIndexArray(TestCase):
+    def _check_get_index(self, lats, lons, minlat, minlon, pixelsize, offset=0):
+        ix, iy = get_index_array(lats, lons, minlat, minlon, pixelsize, offset=offset)
+        expected = [get_index(lat, lon, minlat, minlon, pixelsize, offset=offset) for lat, lon in zip(lats, lons)]
+        self.assertEqual(list(zip(ix.tolist(), iy.tolist())), expected)
+
+    def test_stations(self):
+        latlons = np.random.RandomState(0).uniform((-21., 135.), (-20., 136.), (50, 2))
+        minlat, minlon = latlons.min(axis=0)
+        for offset in (0, 1, -2):
+            self._check_get_index(latlons[:, 0], latlons[:, 1], minlat, minlon, 0.002, offset=offset)
+
+    def test_halves(self):
+        # exact halves of the pixel on both sides of the origin, and the largest float below a half
+        lons = np.array([0.25, 0.75, 1.25, -0.25, -0.75, -1.25, 0.0, 0.49999999999999994 * 0.5])
+        lats = lons[::-1].copy()
+        for offset in (0, 3):
+            self._check_get_index(lats, lons, 0.0, 0.0, 0.5, offset=offset)
+        self.assertEqual(get_index_array(lats, lons, 0.0, 0.0, 0.5)[0].tolist(), [1, 2, 3, -1, -2, -3, 0, 0])
+
+
+class TestDepthGridCache(TestCase):
+    def setUp(self):
+        _DEPTH_GRID_CACHE.clear()
+        _TRIANGULATION_CACHE.clear()
+        # scattered stations, at least 2 pixels apart in latitude so that each has its own pixel
+        self.latlons = np.column_stack((np.linspace(-21., -20., 30) + np.random.RandomState(0).uniform(0, 0.01, 30),
+                                        np.random.RandomState(2).uniform(135., 136., 30)))
+        self.pendep = -np.random.RandomState(1).uniform(1000, 5000, len(self.latlons))
+
+    def tearDown(self):
+        _DEPTH_GRID_CACHE.clear()
+        _TRIANGULATION_CACHE.clear()
+
+    def _check_griddata(self, result, pendep, method):
+        bbox, zdep, station_points, grid_z = result
+        grid_x, grid_y = np.mgrid[0:zdep.shape[0]:1, 0:zdep.shape[1]:1]
+        expected = griddata(station_points, np.abs(pendep), (grid_x, grid_y), method=method)
+        expected[expected < 0] = np.nan
+        np.testing.assert_array_equal(np.isnan(grid_z), np.isnan(expected))
+        valid = ~np.isnan(expected)
+        np.testing.assert_allclose(grid_z[valid], expected[valid], rtol=1e-10)
+        np.testing.assert_array_equal(zdep[station_points[:, 0], station_points[:, 1]],
+                                      np.abs(pendep).astype(np.float32))
+
+    def test_build_depth_grid(self):
+        for method in ('linear', 'cubic'):
+            result = build_depth_grid(self.latlons, self.pendep, pixelsize=0.01, method=method)
+            self._check_griddata(result, self.pendep, method)
+            # the same stations and depths hit the cache
+            self.assertIs(build_depth_grid(self.latlons.tolist(), self.pendep.tolist(), pixelsize=0.01,
+                                           method=method), result)
+
+    def test_build_depth_grid_miss(self):
+        result = build_depth_grid(self.latlons, self.pendep, pixelsize=0.01)
+        # the depths at another period
+        pendep = self.pendep * 1.5
+        other = build_depth_grid(self.latlons, pendep, pixelsize=0.01)
+        self.assertIsNot(other, result)
+        self._check_griddata(other, pendep, 'linear')
+        # other stations
+        latlons = self.latlons + 0.05
+        self.assertIsNot(build_depth_grid(latlons, self.pendep, pixelsize=0.01), result)
+        # other grid parameters
+        self.assertIsNot(build_depth_grid(self.latlons, self.pendep, pixelsize=0.02), result)
+        self.assertIsNot(build_depth_grid(self.latlons, self.pendep, pixelsize=0.01, method='cubic'), result)
+        self.assertIs(build_depth_grid(self.latlons, self.pendep, pixelsize=0.01), result)
+
+    def test_triangulation(self):
+        points = np.random.RandomState(2).uniform(0, 50, (30, 2))
+        tri = get_triangulation(points)
+        self.assertIs(get_triangulation(points.copy()), tri)
+        self.assertIsNot(get_triangulation(points[::-1].copy()), tri)
+        self.assertIsNot(get_triangulation(points[:-1].copy()), tri)
+
+        grid_x, grid_y = np.mgrid[0:50:1, 0:50:1]
+        for seed in (3, 4):
+            # the values at another period, on the same triangulation
+            values = np.random.RandomState(seed).uniform(100, 1000, len(points))
+            for method in ('linear', 'cubic'):
+                expected = griddata(points, values, (grid_x, grid_y), method=method)
+                actual = interpolate_grid(points, values, grid_x, grid_y, method=method)
+                np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+                valid = ~np.isnan(expected)
+                np.testing.assert_allclose(actual[valid], expected[valid], rtol=1e-10)
+        self.assertIs(get_triangulation(points), tri)
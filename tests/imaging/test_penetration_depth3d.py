@@ -1,5 +1,12 @@
+import glob
+import os
+import re
+
+import matplotlib.pyplot as plt
+import numpy as np
 import pytest
-from mtpy.imaging.penetration_depth3d import plot_latlon_depth_profile
+from mtpy.imaging.penetration import clear_mt_cache, get_penetration_depth, load_edi_files, load_mt, Depth2D
+from mtpy.imaging.penetration_depth3d import create_csv_file, plot_bar3d_depth, plot_latlon_depth_profile
 from mtpy.imaging.penetration_depth3d import plot_many_periods
 from tests.imaging import ImageTestCase, ImageCompare
 
@@ -24,3 +31,68 @@ class TestPenetration_depth3d(ImageTestCase):
 
     def test_plot_many_periods(self):
         plot_many_periods(self._edifiles_small, n_periods=3)
+
+    def test_mt_cache_depth2d_then_depth3d(self):
+        edi_files = sorted(glob.glob(os.path.join(self._edifiles_small, '*.edi')))
+        clear_mt_cache()
+        expected = get_penetration_depth(edi_files, 10, 'det')
+
+        # Depth2D rotates the MT objects it is given when it builds the profile
+        Depth2D(load_edi_files(self._edifiles_small, cache=True), [0, 10], 'det').plot()
+
+        result = get_penetration_depth(edi_files, 10, 'det')
+        self.assertEqual(result[0], expected[0])
+        for actual, desired in zip(result[1:], expected[1:]):
+            np.testing.assert_array_equal(actual, desired)
+        clear_mt_cache()
+
+    def test_load_mt_cache_returns_copies(self):
+        edi_file = sorted(glob.glob(os.path.join(self._edifiles_small, '*.edi')))[0]
+        mt_obj = load_mt(edi_file, cache=True)
+        self.assertIsNot(load_mt(edi_file, cache=True), mt_obj)
+        mt_obj.Z.z[:] = 0
+        self.assertTrue(np.any(load_mt(edi_file, cache=True).Z.z != 0))
+        clear_mt_cache()
+
+    def test_create_csv_file(self):
+        outputcsv = os.path.join(self._temp_dir, 'pen_depth.csv')
+        latlon_dep = create_csv_file(self._edifiles_small, outputcsv)
+        self.assertIsInstance(latlon_dep, np.ndarray)
+        self.assertEqual(latlon_dep.ndim, 2)
+        self.assertGreater(len(latlon_dep), 0)
+        self.assertLessEqual(len(latlon_dep), len(glob.glob(os.path.join(self._edifiles_small, '*.edi'))))
+
+        # one unquoted row per station: lat, lon with 6 decimals, then one depth per period with 2 decimals
+        row_pattern = re.compile(r'^-?\d+\.\d{6},-?\d+\.\d{6}(,-?\d+\.\d{2}){%d}$' % (latlon_dep.shape[1] - 2))
+        with open(outputcsv) as csv_file:
+            lines = csv_file.read().splitlines()
+        self.assertEqual(len(lines), len(latlon_dep))
+        for line in lines:
+            self.assertRegexpMatches(line, row_pattern)
+
+        written = np.loadtxt(outputcsv, delimiter=',', ndmin=2)
+        np.testing.assert_allclose(written[:, :2], latlon_dep[:, :2], rtol=0, atol=5e-7)
+        np.testing.assert_allclose(written[:, 2:], latlon_dep[:, 2:], rtol=0, atol=5e-3)
+
+    def test_plot_bar3d_depth_heatmap(self):
+        plot_bar3d_depth(self._edifiles_small, 10)
+        ax = plt.gcf().axes[0]
+        self.assertEqual(len(ax.collections), 1)  # the interpolated depths
+        self.assertEqual(len(ax.lines), 1)  # the stations
+        self.assertEqual(len(ax.lines[0].get_xdata()), len(glob.glob(os.path.join(self._edifiles_small, '*.edi'))))
+
+    def test_plot_bar3d_depth_bar3d(self):
+        plot_bar3d_depth(self._edifiles_small, 10, mode='bar3d')
+
+    def test_plot_bar3d_depth_wrong_mode(self):
+        with self.assertRaises(Exception):
+            plot_bar3d_depth(self._edifiles_small, 10, mode='bar')
+
+    def test_get_penetration_depth_generator(self):
+        edi_files = sorted(glob.glob(os.path.join(self._edifiles_small, '*.edi')))
+        expected = get_penetration_depth(edi_files, 10, 'det')
+        for processes in (1, 2):
+            result = get_penetration_depth((edi_file for edi_file in edi_files), 10, 'det', processes=processes)
+            self.assertEqual(result[0], expected[0])
+            for actual, desired in zip(result[1:], expected[1:]):
+                np.testing.assert_array_equal(actual, desired)
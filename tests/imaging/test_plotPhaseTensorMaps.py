@@ -1,12 +1,11 @@
 import glob
-import inspect
 import os.path
 import unittest
 
 import pytest
 
 from mtpy.imaging.penetration import load_edi_files
-from mtpy.imaging.phase_tensor_maps import PlotPhaseTensorMaps
+from mtpy.imaging.phase_tensor_maps import PlotPhaseTensorMaps, clear_mt_list_cache
 from tests.imaging import ImageTestCase, ImageCompare
 
 
@@ -60,6 +59,12 @@ class TestPlotPhaseTensorMaps(ImageTestCase):
         #                      'xborderpad': 0.07,
         #                      'yborderpad': 0.015}
 
+    @classmethod
+    def tearDownClass(cls):
+        # the tests of the same edi path share the parsed edi files
+        clear_mt_list_cache()
+        super(TestPlotPhaseTensorMaps, cls).tearDownClass()
+
     @unittest.skipUnless(os.path.isdir("data/edifiles2"), "data file not found")
     @unittest.expectedFailure
     def test_edifiles2_input(self):
@@ -74,8 +79,8 @@ class TestPlotPhaseTensorMaps(ImageTestCase):
         mt_objs = load_edi_files(edi_path)
         z_objs = [mt.Z for mt in mt_objs]
         tipper = [mt.Tipper for mt in mt_objs]
-        save_figure_path = os.path.join(self._temp_dir, "%s.png" % inspect.currentframe().f_code.co_name)
-        save_param_path = os.path.join(self._temp_dir, "params_%s" % inspect.currentframe().f_code.co_name)
+        save_figure_path = os.path.join(self._temp_dir, "test_edifiles2_input.png")
+        save_param_path = os.path.join(self._temp_dir, "params_test_edifiles2_input")
         pt_obj = PlotPhaseTensorMaps(z_object_list=z_objs,
                                      tipper_object_list=tipper,
                                      plot_freq=freq,
@@ -115,12 +120,26 @@ class TestPlotPhaseTensorMaps(ImageTestCase):
         assert (os.path.isdir(save_param_path))
 
 
+# the edi files of the edi paths listed by _edi_list()
+_edi_lists = {}
+
+
+def _edi_list(edi_path):
+    """
+    list the edi files in edi_path, once for all the tests using the same path
+    """
+    if edi_path not in _edi_lists:
+        _edi_lists[edi_path] = tuple(glob.glob(os.path.join(edi_path, "*.edi")))
+    return _edi_lists[edi_path]
+
+
 def _test_gen(edi_path, freq):
     def default(self):
         save_figure_path = os.path.join(self._temp_dir, "%s.png" % default.__name__)
         save_param_path = os.path.join(self._temp_dir, "params_%s" % default.__name__)
-        edi_file_list = glob.glob(os.path.join(edi_path, "*.edi"))
+        edi_file_list = list(_edi_list(edi_path))
         pt_obj = PlotPhaseTensorMaps(fn_list=edi_file_list,
+                                     cache_edi=True,
                                      plot_freq=freq,
                                      ftol=0.10,  # freq tolerance,which will decide how many data points included
                                      mapscale='deg',  # deg or m, or km
@@ -6,9 +6,16 @@ Created on Tue Oct 04 13:13:29 2016
 
 Plot responses from ModEM model.
 """
+import os
 import os.path as op
+from unittest import TestCase
+
+import matplotlib.image as mpimg
+import matplotlib.pyplot as plt
+import numpy as np
 
 from mtpy.modeling.modem import PlotResponse
+from mtpy.modeling.modem.plot_response import _normalized_residual, _residual_rms
 from tests import SAMPLE_DIR
 from tests.imaging import ImageTestCase
 
@@ -27,3 +34,132 @@ class Test_ModEM_PlotResponse(ImageTestCase):
                           plot_z=plot_z)
 
         ro.plot()
+
+    def test_modular_MPI_NLCG_004_batched(self):
+        wd = op.normpath(op.join(SAMPLE_DIR, 'ModEM'))
+        filestem = 'Modular_MPI_NLCG_004'
+        datafn = 'ModEM_Data.dat'
+        station = 'pb23'
+
+        for plot_z in (False, True):
+            ro = PlotResponse(data_fn=op.join(wd, datafn),
+                              resp_fn=op.join(wd, filestem + '.dat'),
+                              plot_type=[station],
+                              plot_z=plot_z,
+                              batched=True)
+
+            ro.plot()
+            # resistivity, phase and tipper axes
+            self.assertEqual(len(ro.ax_list), 3)
+            self.assertEqual(len(ro.fig_list), 1)
+
+    def test_modular_MPI_NLCG_004_replot(self):
+        wd = op.normpath(op.join(SAMPLE_DIR, 'ModEM'))
+        filestem = 'Modular_MPI_NLCG_004'
+        datafn = 'ModEM_Data.dat'
+        station = 'pb23'
+
+        ro = PlotResponse(data_fn=op.join(wd, datafn),
+                          resp_fn=op.join(wd, filestem + '.dat'),
+                          plot_type=[station])
+        ro.plot()
+        ro.plot()
+        self.assertEqual(len(ro.fig_list), 1)
+        ro.redraw_plot(force=True)
+        self.assertEqual(len(ro.fig_list), 1)
+
+    def test_modular_MPI_NLCG_004_save_tight(self):
+        wd = op.normpath(op.join(SAMPLE_DIR, 'ModEM'))
+        filestem = 'Modular_MPI_NLCG_004'
+        datafn = 'ModEM_Data.dat'
+        station = 'pb23'
+
+        ro = PlotResponse(data_fn=op.join(wd, datafn),
+                          resp_fn=op.join(wd, filestem + '.dat'),
+                          plot_type=[station])
+        ro.plot()
+        save_fn = op.join(self._temp_dir, 'tight.png')
+        ro.save_figure(save_fn, close_fig='n', tight=True)
+
+        fig, bbox = ro._tight_bbox
+        renderer = fig.canvas.get_renderer()
+        # the legends above the axes and the station title are inside the saved box
+        artists = [ax.get_legend() for ref_fig, ax, handles, labels, kwargs in ro._legend_refs]
+        artists.append(fig._suptitle)
+        self.assertGreater(len(artists), 1)
+        for artist in artists:
+            extent = artist.get_window_extent(renderer)
+            self.assertGreaterEqual(extent.x0 / fig.dpi, bbox.x0)
+            self.assertGreaterEqual(extent.y0 / fig.dpi, bbox.y0)
+            self.assertLessEqual(extent.x1 / fig.dpi, bbox.x1)
+            self.assertLessEqual(extent.y1 / fig.dpi, bbox.y1)
+
+        # the saved image is the size of the box
+        height, width = mpimg.imread(save_fn).shape[:2]
+        self.assertAlmostEqual(width, bbox.width * fig.dpi, delta=2)
+        self.assertAlmostEqual(height, bbox.height * fig.dpi, delta=2)
+
+    def test_modular_MPI_NLCG_004_batched_show_save(self):
+        wd = op.normpath(op.join(SAMPLE_DIR, 'ModEM'))
+        filestem = 'Modular_MPI_NLCG_004'
+        datafn = 'ModEM_Data.dat'
+        station = 'pb23'
+
+        shown = []
+        show = plt.show
+        plt.show = lambda *args, **kwargs: shown.append(plt.gcf())
+        try:
+            for batched in (False, True):
+                del shown[:]
+                save_dir = op.join(self._temp_dir, 'batched' if batched else 'components')
+                os.mkdir(save_dir)
+                ro = PlotResponse(data_fn=op.join(wd, datafn),
+                                  resp_fn=op.join(wd, filestem + '.dat'),
+                                  plot_type=[station],
+                                  batched=batched)
+                ro.plot(save_dir=save_dir)
+                # the station figure is shown and saved by both paths
+                self.assertEqual(shown, ro.fig_list)
+                self.assertTrue(op.isfile(op.join(save_dir, station + '.png')))
+        finally:
+            plt.show = show
+
+
+class Test_ModEM_PlotResponse_rms(TestCase):
+    def setUp(self):
+        random = np.random.RandomState(0)
+        shape = (20, 2, 2)
+        self.z = random.normal(size=shape) + 1j * random.normal(size=shape)
+        self.z_resp = self.z + 0.1 * (random.normal(size=shape) + 1j * random.normal(size=shape))
+        self.z_err = random.uniform(0.05, 0.2, shape)
+        # masked points: no data, response and error
+        self.z[3, 0, 0] = self.z_resp[3, 0, 0] = self.z_err[3, 0, 0] = 0
+        self.z[7] = self.z_resp[7] = self.z_err[7] = 0
+        self.t = self.z[:, :1, :]
+        self.t_resp = self.z_resp[:, :1, :]
+        self.t_err = self.z_err[:, :1, :]
+
+    def test_normalized_residual(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = np.nan_to_num((self.z - self.z_resp) / self.z_err)
+        np.testing.assert_array_equal(_normalized_residual(self.z, self.z_resp, self.z_err), expected)
+
+        # a residual without error
+        self.z_resp[5, 1, 1] += 1
+        self.z_err[5, 1, 1] = 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = np.nan_to_num((self.z - self.z_resp) / self.z_err)
+        np.testing.assert_array_equal(_normalized_residual(self.z, self.z_resp, self.z_err), expected)
+
+    def test_residual_rms(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_residual = np.nan_to_num((self.z - self.z_resp) / self.z_err)
+            t_residual = np.nan_to_num((self.t - self.t_resp) / self.t_err)
+        expected = [z_residual[:, 0, 0].std(), z_residual[:, 0, 1].std(),
+                    z_residual[:, 1, 0].std(), z_residual[:, 1, 1].std()]
+        np.testing.assert_allclose(_residual_rms(_normalized_residual(self.z, self.z_resp, self.z_err)),
+                                   expected, rtol=1e-12)
+        expected += [t_residual[:, 0, 0].std(), t_residual[:, 0, 1].std()]
+        np.testing.assert_allclose(_residual_rms(_normalized_residual(self.z, self.z_resp, self.z_err),
+                                                 _normalized_residual(self.t, self.t_resp, self.t_err)),
+                                   expected, rtol=1e-12)
@@ -1,4 +1,3 @@
-import inspect
 import os
 import unittest
 from unittest import TestCase
@@ -24,27 +23,27 @@ class TestPTShapeFile(TestCase):
 
     def test_shapefile_01(self):
         edi_path = edi_paths[1]
-        self._create_shape_file(edi_path, os.path.join(self._temp_dir, inspect.currentframe().f_code.co_name))
+        self._create_shape_file(edi_path, os.path.join(self._temp_dir, "test_shapefile_01"))
 
     @unittest.skipUnless(os.path.isdir(edi_paths[2]), "data file not found")
     def test_shapefile_02(self):
         edi_path = edi_paths[2]
-        self._create_shape_file(edi_path, os.path.join(self._temp_dir, inspect.currentframe().f_code.co_name))
+        self._create_shape_file(edi_path, os.path.join(self._temp_dir, "test_shapefile_02"))
 
     @unittest.skipUnless(os.path.isdir(edi_paths[3]), "data file not found")
     def test_shapefile_03(self):
         edi_path = edi_paths[3]
-        self._create_shape_file(edi_path, os.path.join(self._temp_dir, inspect.currentframe().f_code.co_name))
+        self._create_shape_file(edi_path, os.path.join(self._temp_dir, "test_shapefile_03"))
 
     @unittest.skipUnless(os.path.isdir(edi_paths[4]), "data file not found")
     def test_shapefile_04(self):
         edi_path = edi_paths[4]
-        self._create_shape_file(edi_path, os.path.join(self._temp_dir, inspect.currentframe().f_code.co_name))
+        self._create_shape_file(edi_path, os.path.join(self._temp_dir, "test_shapefile_04"))
 
     @unittest.skipUnless(os.path.isdir(edi_paths[5]), "data file not found")
     def test_shapefile_05(self):
         edi_path = edi_paths[5]
-        self._create_shape_file(edi_path, os.path.join(self._temp_dir, inspect.currentframe().f_code.co_name))
+        self._create_shape_file(edi_path, os.path.join(self._temp_dir, "test_shapefile_05"))
 
     @staticmethod
     def _create_shape_file(edi_path, save_path):
@@ -0,0 +1,52 @@
+import warnings
+from unittest import TestCase
+
+from mtpy.utils.decorator import deprecated
+
+
+@deprecated("testing")
+def _deprecated_function():
+    return 1
+
+
+@deprecated("testing")
+class _DeprecatedClass(object):
+    pass
+
+
+@deprecated("testing")
+class _OtherDeprecatedClass(object):
+    pass
+
+
+class TestDeprecated(TestCase):
+    def test_warn_once(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('default')
+            self.assertEqual(_deprecated_function(), 1)
+            _deprecated_function()
+            _DeprecatedClass()
+            _DeprecatedClass()
+            _OtherDeprecatedClass()
+        self.assertEqual([str(warning.message) for warning in caught],
+                         ["Call to deprecated function or method _deprecated_function (testing).",
+                          "Call to deprecated class _DeprecatedClass (testing).",
+                          "Call to deprecated class _OtherDeprecatedClass (testing)."])
+        self.assertTrue(all(warning.category is DeprecationWarning for warning in caught))
+
+    def test_ignore_then_always(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('ignore')
+            _deprecated_function()
+            self.assertEqual(len(caught), 0)
+            warnings.simplefilter('always')
+            _deprecated_function()
+            _deprecated_function()
+        self.assertEqual(len(caught), 2)
+
+    def test_filters_reset(self):
+        for _ in range(2):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('default')
+                _deprecated_function()
+            self.assertEqual(len(caught), 1)